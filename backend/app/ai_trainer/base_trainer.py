@@ -1,17 +1,360 @@
-class BaseTrainer:
+import math
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from app.ai_trainer.frame_ingest import FrameIngest
+from app.ai_trainer.hold_monitor import HoldMonitor
+from app.ai_trainer.keyframes import KeyframeTracker
+from app.ai_trainer.landmarks import landmark_array, mirror_landmarks, parse_landmarks
+from app.ai_trainer.pose_input import PoseInput
+from app.ai_trainer.pose_pool import pose_pool_for
+from app.ai_trainer.recording import new_recorder
+from app.ai_trainer.registry import EXERCISES
+from app.ai_trainer.rep_engine import RepCounter
+from app.ai_trainer.stage_timer import NULL_TIMER, StageTimer
+from app.config import settings
+from app.utils.frame_protocol import encode_image
+
+mp_drawing = mp.solutions.drawing_utils
+mp_pose = mp.solutions.pose
+
+# (position, font scale, color) of each overlay text line
+OVERLAY_STYLES = [
+    ((20, 50), 1, (0, 255, 0)),
+    ((20, 90), 0.8, (0, 255, 255)),
+    ((20, 130), 0.7, (255, 255, 255)),
+]
+
+
+def parse_flag(value):
+    """Session option to bool, accepting query-string style values ("0", "false", "no", "off")."""
+    if isinstance(value, str):
+        return value.strip().lower() not in ("0", "false", "no", "off", "")
+    return bool(value)
+
+
+def landmarks_to_list(landmarks):
+    """Pose landmarks as [[x, y, z, visibility], ...] in MediaPipe index order."""
+    if not landmarks:
+        return None
+    return [[round(lm.x, 4), round(lm.y, 4), round(lm.z, 4), round(lm.visibility, 3)] for lm in landmarks]
+
+
+def landmark_proto(landmarks):
+    """Landmark tuples as a NormalizedLandmarkList, for mp_drawing"""
+    return landmark_pb2.NormalizedLandmarkList(landmark=[
+        landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z, visibility=lm.visibility) for lm in landmarks
+    ])
+
+
+class FrameTrainer:
+    """Per-connection trainer session: owns its counter state and a Pose tracker
+    checked out of the shared pool, so concurrent users never share reps or tracking.
+
+    Subclasses implement process_landmarks(); decoding, inference and the
+    annotated frame are handled here. Clients that run pose detection
+    themselves send landmarks to process_pose() and skip all of that.
+    """
+
     def __init__(self):
-        self.reps = 0
-        self.stage = None
-        self.form_score = 0
-
-    def calculate_angle(self, a, b, c):
-        import math
-        ba = (a['x'] - b['x'], a['y'] - b['y'])
-        bc = (c['x'] - b['x'], c['y'] - b['y'])
-        cosine_angle = (ba[0]*bc[0] + ba[1]*bc[1]) / (
-            (ba[0]**2 + ba[1]**2)**0.5 * (bc[0]**2 + bc[1]**2)**0.5
-        )
-        return round(math.degrees(math.acos(max(-1, min(1, cosine_angle)))), 2)
+        # Pose model for this session, None for settings.POSE_MODEL_COMPLEXITY
+        self.model_complexity = None
+        # Checked out on the first image, so landmark-only sessions never hold a graph
+        self._pose_pool = None
+        self.pose = None
+        self.ingest = FrameIngest()
+        self.pose_input = PoseInput()
+        # Selfie view of the frame the overlay is drawn on, reused between frames
+        self._flipped = None
+        # Annotated frame encoding: JPEG quality, downscale, and an image on every Nth result only
+        self.output_quality = settings.FRAME_JPEG_QUALITY
+        self.output_scale = settings.FRAME_OUTPUT_SCALE
+        self.output_every = settings.FRAME_OUTPUT_EVERY
+        self._frames_until_image = 0
+        # echo=False: return landmarks instead of drawing and re-encoding the frame
+        self.echo = True
+        # mirror=True: client landmarks come from the unmirrored camera image
+        self.mirror = False
+        # Full inference only on keyframes, landmarks estimated in between (off at 1)
+        self.keyframes = KeyframeTracker()
+        # Last annotated frame (or landmarks), re-sent with results for skipped frames
+        self._last_output = {}
+        # ?session=<id>: results carry state() for the session store
+        self.report_state = False
+        # ?record=1 (or TRAINER_RECORD_ALL): per-frame landmarks and counts go to a recording
+        self.record = settings.TRAINER_RECORD_ALL and bool(settings.TRAINER_RECORD_DIR)
+        self._recorder = None
+        # Per-stage timings of process_frame, returned with each result as "stages"
+        self.stage_timer = StageTimer(keep=False) if settings.METRICS_ENABLED else NULL_TIMER
+
+    def set_options(self, options):
+        """Apply session options from the connect query string or an {"options": {...}} message."""
+        if "echo" in options:
+            self.echo = parse_flag(options["echo"])
+        if "mirror" in options:
+            self.mirror = parse_flag(options["mirror"])
+        if "session" in options:
+            self.report_state = bool(options["session"])
+        if "record" in options:
+            record = parse_flag(options["record"])
+            if record and not settings.TRAINER_RECORD_DIR:
+                print("⚠️ Recording requested but TRAINER_RECORD_DIR is not set")
+                record = False
+            if not record:
+                self._stop_recording()
+            self.record = record
+        if "keyframes" in options:
+            interval = int(options["keyframes"])
+            if interval < 1:
+                raise ValueError("keyframes must be at least 1")
+            self.keyframes = KeyframeTracker(max_interval=interval)
+        if "quality" in options:
+            quality = int(options["quality"])
+            if not 1 <= quality <= 100:
+                raise ValueError("quality must be between 1 and 100")
+            self.output_quality = quality
+        if "scale" in options:
+            scale = float(options["scale"])
+            if not 0 < scale <= 1:
+                raise ValueError("scale must be above 0 and at most 1")
+            self.output_scale = scale
+        if "frame_every" in options:
+            every = int(options["frame_every"])
+            if every < 1:
+                raise ValueError("frame_every must be at least 1")
+            self.output_every = every
+            self._frames_until_image = 0
+
+    def process_landmarks(self, landmarks, now=None):
+        """Counter result for one frame; now is the frame's monotonic time (hold timers)"""
+        raise NotImplementedError("Each trainer must implement process_landmarks()")
+
+    def overlay_lines(self, result):
+        """Text drawn on the annotated frame."""
+        return [f"Reps: {result['count']}", result["feedback"]]
+
+    def skip_frame(self):
+        """Result for a frame that doesn't need to be looked at, None to process it"""
+        return None
+
+    def state(self):
+        """Session state worth keeping across reconnects (counts, timers), as plain data"""
+        return {}
+
+    def restore(self, state):
+        """Continue from a state() saved by an earlier connection"""
+        pass
+
+    def recording_info(self):
+        """What a recording of this session is of (exercise, stations), stored next to it"""
+        return {}
+
+    def _record(self, landmarks, result, now):
+        try:
+            if self._recorder is None:
+                self._recorder = new_recorder(settings.TRAINER_RECORD_DIR, self.recording_info())
+            self._recorder.add(landmarks, result, now)
+        except OSError as e:
+            # A full or read-only disk shouldn't end the workout
+            print(f"⚠️ Recording stopped: {e}")
+            self.record = False
+            self._stop_recording()
+
+    def _stop_recording(self):
+        if self._recorder is not None:
+            recorder, self._recorder = self._recorder, None
+            try:
+                recorder.close()
+            except OSError as e:
+                print(f"⚠️ Could not finish recording {recorder.path}: {e}")
 
     def process_pose(self, landmarks):
-        raise NotImplementedError("Each trainer must implement process_pose()")
+        """Run only the rep logic on landmarks computed by the client (no decode, no inference)"""
+        try:
+            points = parse_landmarks(landmarks)
+            if points and self.mirror:
+                # Server-side inference runs on the flipped (selfie) image
+                points = mirror_landmarks(points)
+            now = time.monotonic()
+            result = self.process_landmarks(points, now)
+            if self.record:
+                self._record(points, result, now)
+            if self.report_state:
+                result["state"] = self.state()
+            for key in ("angle", "metric"):
+                # Missing client points give NaN, which isn't valid JSON
+                if result.get(key) is not None and math.isnan(result[key]):
+                    result[key] = None
+            return result
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    def process_frame(self, frame_data):
+        """Accept base64 data URL or raw JPEG bytes, return annotated JPEG (or landmarks) + count + feedback"""
+        try:
+            skipped = self.skip_frame()
+            if skipped is not None:
+                skipped.update(self._last_output)
+                return skipped
+
+            if self.pose is None:
+                self._pose_pool = pose_pool_for(self.model_complexity)
+                # Never wait for a graph on a trainer worker, that would stall the sessions
+                # that hold one: the socket handler retries from the event loop instead
+                self.pose = self._pose_pool.try_acquire()
+                if self.pose is None:
+                    return {"error": f"No free pose graph ({self._pose_pool.size} in use)", "pose_busy": True}
+
+            timer = self.stage_timer
+            timer.start()
+            data = self.ingest.jpeg(frame_data)
+            timer.lap("b64decode")
+            # Landmarks-only sessions never show the frame: decode just big enough for the model
+            factor = 1 if self.echo else self.pose_input.reduction(self.ingest.source_size)
+            frame = self.ingest.decode(data, factor)
+            timer.lap("imdecode")
+
+            # Inference, ROI and keyframe tracking all work on the camera image as sent;
+            # only the landmarks are mirrored into the selfie view trainers expect
+            if self.keyframes.due():
+                # Cropped to the previous frame's ROI and downscaled to the model's resolution
+                image_rgb = self.pose_input.prepare(frame)
+                timer.lap("prepare")
+                results = self.pose.process(image_rgb)
+                timer.lap("inference")
+                landmarks = results.pose_landmarks.landmark if results.pose_landmarks else None
+                if landmarks:
+                    self.pose_input.map_landmarks(landmarks)
+                if self.pose_input.update(landmarks):
+                    # The graph's tracking refers to the old crop
+                    self.pose.reset()
+                if self.keyframes.enabled:
+                    self.keyframes.observe(frame, landmark_array(landmarks) if landmarks else None)
+                estimated = False
+            else:
+                landmarks = self.keyframes.estimate(frame)
+                estimated = True
+            if landmarks:
+                landmarks = mirror_landmarks(landmarks)
+            timer.lap("tracking")
+
+            now = time.monotonic()
+            result = self.process_landmarks(landmarks, now)
+            if self.record:
+                self._record(landmarks, result, now)
+            if self.report_state:
+                result["state"] = self.state()
+            if self.keyframes.enabled:
+                result["estimated"] = estimated
+            timer.lap("counter")
+
+            if not self.echo:
+                # Client draws its own overlay: skip drawing and the JPEG re-encode
+                result["landmarks"] = landmarks_to_list(landmarks)
+                self._last_output = {"landmarks": result["landmarks"]}
+                if timer.current:
+                    result["stages"] = dict(timer.current)
+                return result
+
+            if self._frames_until_image > 0:
+                # Counts and feedback every frame, the picture only every output_every-th;
+                # frame=None keeps binary clients on the packed format
+                self._frames_until_image -= 1
+                result["frame"] = None
+                if timer.current:
+                    result["stages"] = dict(timer.current)
+                return result
+            self._frames_until_image = self.output_every - 1
+
+            scale = self.output_scale
+            if scale < 1:
+                # Downscaled before drawing, so the overlay isn't resampled and costs less
+                height, width = frame.shape[:2]
+                size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            # The annotated frame is the only full-frame flip left, into a reused buffer
+            if self._flipped is None or self._flipped.shape != frame.shape:
+                self._flipped = np.empty_like(frame)
+            frame = cv2.flip(frame, 1, dst=self._flipped)
+            timer.lap("flip")
+
+            if landmarks:
+                thickness = max(1, round(2 * scale))
+                mp_drawing.draw_landmarks(
+                    frame, landmark_proto(landmarks), mp_pose.POSE_CONNECTIONS,
+                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=thickness, circle_radius=thickness),
+                    mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=thickness)
+                )
+                for text, ((x, y), font_scale, color) in zip(self.overlay_lines(result), OVERLAY_STYLES):
+                    cv2.putText(frame, text, (round(x * scale), round(y * scale)), cv2.FONT_HERSHEY_SIMPLEX,
+                                font_scale * scale, color, thickness)
+            timer.lap("draw")
+
+            result["frame"] = encode_image(frame, self.output_quality)
+            timer.lap("imencode")
+            if timer.current:
+                result["stages"] = dict(timer.current)
+            self._last_output = {"frame": result["frame"]}
+            return result
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    def close(self):
+        self._stop_recording()
+        if self.pose is not None:
+            self._pose_pool.release(self.pose)
+            self.pose = None
+
+
+class SpecTrainer(FrameTrainer):
+    """Trainer session for any exercise in the spec table."""
+
+    def __init__(self, spec):
+        super().__init__()
+        self.counter = RepCounter(spec)
+        self.model_complexity = spec.model_complexity
+        # Holds are checked at a low rate while steady, timed by the server clock
+        self.hold = HoldMonitor(spec) if spec.mode == "hold" else None
+        self._last_result = None
+
+    def overlay_lines(self, result):
+        return [line.format_map(result) for line in self.counter.spec.overlay]
+
+    def state(self):
+        return self.counter.state()
+
+    def restore(self, state):
+        self.counter.restore(state)
+
+    def recording_info(self):
+        # Registry key, which the display name in the spec isn't always ("push-ups")
+        spec = self.counter.spec
+        return {"exercise": next((name for name, other in EXERCISES.items() if other == spec), spec.name)}
+
+    def skip_frame(self):
+        if self.hold is None or self._last_result is None:
+            return None
+        now = time.monotonic()
+        if self.hold.due(now):
+            return None
+        return dict(self._last_result, time=self.counter.elapsed(now), skipped=True)
+
+    def process_landmarks(self, landmarks, now=None):
+        """Update the counter from one frame's pose landmarks (None when nobody is visible)"""
+        # The same time the recorder stores, so replays time holds exactly as the session did
+        now = time.monotonic() if now is None else now
+        if self.hold is None:
+            return self.counter.update(landmark_array(landmarks) if landmarks else None, now)
+
+        values = self.counter.measure(landmark_array(landmarks)) if landmarks else None
+        result = self.counter.step(values, now)
+        # Read by the socket handler to cap the client's frame rate
+        result["check_fps"] = self.hold.checked(self.counter.in_position, values, now)
+        self._last_result = dict(result)
+        return result
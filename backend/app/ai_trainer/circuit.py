@@ -0,0 +1,163 @@
+import time
+
+from app.ai_trainer.base_trainer import FrameTrainer
+from app.ai_trainer.landmarks import landmark_array
+from app.ai_trainer.rep_engine import RepCounter
+from app.config import settings
+
+CIRCUIT_MODES = ("sequence", "parallel")
+
+
+class CircuitTrainer(FrameTrainer):
+    """One session, one decode and one pose inference per frame, several exercise counters.
+
+    Options (query string or {"options": {...}} message):
+      exercises  comma-separated stations, e.g. "squats,lunges,calfraise"
+      mode       "sequence" (default) advances to the next station once the current
+                 one reaches its target; "parallel" updates every counter each frame
+      target     reps (seconds for holds) per station, defaults to each spec's target
+                 or set length
+      station    jump to a station by name or position
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stations = []
+        self.counters = []
+        self.results = []
+        self.mode = "sequence"
+        self.target = None
+        self.active = 0
+        self.complete = False
+
+    def set_options(self, options):
+        super().set_options(options)
+        if "exercises" in options:
+            self._set_stations(options["exercises"])
+        if "mode" in options:
+            if options["mode"] not in CIRCUIT_MODES:
+                raise ValueError(f"Unknown circuit mode: {options['mode']}")
+            self.mode = options["mode"]
+        if "target" in options:
+            self.target = int(options["target"]) if options["target"] not in (None, "") else None
+        if "station" in options:
+            self._jump(options["station"])
+
+    def _set_stations(self, exercises):
+        # Imported here: the registry loads this module lazily
+        from app.ai_trainer.registry import EXERCISES, normalize_name
+
+        if isinstance(exercises, str):
+            exercises = exercises.split(",")
+        stations = [normalize_name(name) for name in exercises if name.strip()]
+        unknown = [name for name in stations if name not in EXERCISES]
+        if unknown:
+            raise ValueError(f"Unknown exercise in circuit: {', '.join(unknown)}")
+        self.stations = stations
+        # No set-length reset: the circuit's target ends a station, and may be above set_length
+        self.counters = [RepCounter(EXERCISES[name], auto_reset=False) for name in stations]
+        # One graph serves every station, so use the most accurate model any of them asks for
+        complexities = [counter.spec.model_complexity for counter in self.counters]
+        if self.pose is None and any(c is not None for c in complexities):
+            self.model_complexity = max(c if c is not None else settings.POSE_MODEL_COMPLEXITY for c in complexities)
+        # Latest result per station, kept after the circuit moves on
+        self.results = [None] * len(stations)
+        self.active = 0
+        self.complete = False
+
+    def _jump(self, station):
+        if isinstance(station, str) and not station.isdigit():
+            if station not in self.stations:
+                raise ValueError(f"Station not in circuit: {station}")
+            station = self.stations.index(station)
+        station = int(station)
+        if not 0 <= station < len(self.stations):
+            raise ValueError(f"Station out of range: {station}")
+        self.active = station
+        self.counters[station].reset()
+        self.results[station] = None
+        self.complete = False
+
+    def state(self):
+        return {
+            "stations": list(self.stations),
+            "mode": self.mode,
+            "target": self.target,
+            "active": self.active,
+            "complete": self.complete,
+            "counters": [counter.state() for counter in self.counters],
+        }
+
+    def restore(self, state):
+        if state["stations"]:
+            self._set_stations(state["stations"])
+        self.mode = state["mode"]
+        self.target = state["target"]
+        for i, (counter, saved) in enumerate(zip(self.counters, state["counters"])):
+            counter.restore(saved)
+            # Station progress until the next frame replaces it
+            key, value = ("time", saved["duration"]) if counter.spec.mode == "hold" else ("count", saved["count"])
+            self.results[i] = {key: value, "feedback": "Resumed", counter.metric_name: None, **counter.spec.extra}
+        self.active = state["active"]
+        self.complete = state["complete"]
+
+    def recording_info(self):
+        return {"exercise": "circuit", "stations": list(self.stations), "mode": self.mode}
+
+    def _target(self, counter):
+        if self.target is not None:
+            return self.target
+        return counter.spec.target if counter.spec.target is not None else counter.spec.set_length
+
+    def _done(self, counter, result):
+        target = self._target(counter)
+        if target is None:
+            # A station that can never finish would silently hold up the whole circuit
+            raise ValueError(f"Circuit station {counter.spec.name} needs a target, e.g. ?target=10")
+        return result.get("count", result.get("time", 0)) >= target
+
+    def overlay_lines(self, result):
+        counter = self.counters[result["station"]]
+        lines = [line.format_map(result) for line in counter.spec.overlay]
+        lines[0] = f"{result['exercise']} - {lines[0]}"
+        return lines
+
+    def process_landmarks(self, landmarks, now=None):
+        """Update the circuit's counters from one frame's pose landmarks (None when nobody is visible)"""
+        if not self.counters:
+            raise ValueError("Circuit needs a list of exercises, e.g. ?exercises=squats,lunges")
+
+        points = landmark_array(landmarks) if landmarks else None
+        now = time.monotonic() if now is None else now
+        shown = self.active
+
+        if self.mode == "parallel":
+            for i, counter in enumerate(self.counters):
+                self.results[i] = counter.update(points, now)
+        elif not self.complete:
+            counter = self.counters[self.active]
+            self.results[self.active] = counter.update(points, now)
+            # 🔹 Auto switch once the station's target is reached
+            if self._done(counter, self.results[self.active]):
+                if self.active + 1 < len(self.counters):
+                    self.active += 1
+                    self.counters[self.active].reset()
+                    self.results[self.active] = None
+                    self.results[shown]["feedback"] = f"✅ Station done! Next: {self.stations[self.active]}"
+                else:
+                    self.complete = True
+                    self.results[shown]["feedback"] = "✅ Circuit complete!"
+
+        result = dict(self.results[shown] or {"count": 0, "feedback": "Circuit complete!"})
+        result["exercise"] = self.stations[shown]
+        result["station"] = shown
+        result["circuit_complete"] = self.complete
+        result["stations"] = [
+            {"exercise": name, **self._progress(counter, last)}
+            for name, counter, last in zip(self.stations, self.counters, self.results)
+        ]
+        return result
+
+    def _progress(self, counter, result):
+        key = "time" if counter.spec.mode == "hold" else "count"
+        return {key: result[key] if result else 0}
@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.config import settings
+
+
+# Trainer sessions living in this process (the server itself in thread mode,
+# the lane's worker in process mode), keyed by session id.
+_sessions = {}
+
+
+def _session_call(session_id, trainer_class, options, method, args):
+    trainer = _sessions.get(session_id)
+    if trainer is None:
+        # Created on first use, inside the worker, so Pose setup never blocks the loop
+        trainer = trainer_class()
+        if options:
+            trainer.set_options(options)
+        _sessions[session_id] = trainer
+    return getattr(trainer, method)(*args)
+
+
+def _session_close(session_id):
+    trainer = _sessions.pop(session_id, None)
+    if trainer is not None:
+        trainer.close()
+
+
+class SessionLane:
+    """Ordered submission handle for one trainer session.
+
+    Frames of a session run one at a time and in the order they were submitted,
+    while frames of different sessions run in parallel on the pool. The trainer
+    instance behind the lane belongs to this session only.
+    """
+
+    def __init__(self, executor, pool, trainer_class, session_id, options=None):
+        self._executor = executor
+        self._pool = pool
+        self._trainer_class = trainer_class
+        self._options = options or {}
+        self._session_id = session_id
+        self._lock = asyncio.Lock()
+
+    async def run(self, fn, *args):
+        async with self._lock:
+            async with self._executor.pending:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool, fn, *args)
+
+    async def call(self, method, *args):
+        """Call a method on this session's trainer, e.g. call("process_frame", data)."""
+        return await self.run(_session_call, self._session_id, self._trainer_class, self._options, method, args)
+
+    async def close(self):
+        """Release the session's trainer and its Pose graph, also once the executor has shut down."""
+        if not self._executor.closed:
+            try:
+                await self.run(_session_close, self._session_id)
+                return
+            except RuntimeError:
+                # Pool shut down while we waited for the lane
+                if not self._executor.closed:
+                    raise
+        # 🔹 No new futures after shutdown: thread-mode trainers live here, release them inline.
+        # Process-mode trainers go away with their worker process.
+        if self._executor.kind == "thread":
+            _session_close(self._session_id)
+
+
+class FrameExecutor:
+    """Bounded pool that keeps synchronous trainer work off the event loop."""
+
+    def __init__(self, workers=None, kind=None, max_pending=None):
+        self.kind = kind or settings.TRAINER_EXECUTOR
+        self.workers = max(1, workers or settings.TRAINER_WORKERS)
+        self.max_pending = max(1, max_pending or settings.TRAINER_MAX_PENDING)
+        self._pending = None
+        self.closed = False
+
+        if self.kind == "thread":
+            self._pools = [ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="trainer")]
+        elif self.kind == "process":
+            # Trainer state lives in the worker process, so a session must always
+            # hit the same process: one single-worker pool per lane. Spawn rather than
+            # fork, MediaPipe's graph threads don't survive a fork.
+            context = multiprocessing.get_context("spawn")
+            self._pools = [ProcessPoolExecutor(max_workers=1, mp_context=context)
+                           for _ in range(self.workers)]
+        else:
+            raise ValueError(f"Unknown TRAINER_EXECUTOR: {self.kind}")
+        self._next_pool = itertools.cycle(self._pools)
+        self._session_ids = itertools.count()
+
+    @property
+    def pending(self):
+        # Created lazily so the semaphore binds to the running event loop
+        if self._pending is None:
+            self._pending = asyncio.Semaphore(self.max_pending)
+        return self._pending
+
+    def session(self, trainer_class, options=None):
+        """Open a lane with its own trainer for a new session (round-robin over process lanes)."""
+        return SessionLane(self, next(self._next_pool), trainer_class, next(self._session_ids), options)
+
+    def shutdown(self):
+        self.closed = True
+        for pool in self._pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = FrameExecutor()
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
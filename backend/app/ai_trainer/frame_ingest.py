@@ -0,0 +1,41 @@
+import cv2
+
+from app.config import settings
+from app.utils.frame_protocol import decode_jpeg, image_bytes
+
+# JPEG decode flags by size reduction; libjpeg scales during the IDCT, so a
+# reduced decode is cheaper than a full one, not a full one plus a resize
+DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class FrameIngest:
+    """Per-session decode of incoming frames.
+
+    jpeg() gets the compressed bytes without copying raw binary frames or
+    the data URL header; decode() can decode at 1/2, 1/4 or 1/8 size when the
+    caller doesn't need every pixel. source_size remembers the full
+    resolution so the next frame's reduction can be picked before decoding.
+    """
+
+    def __init__(self, reduced=None):
+        self.reduced = settings.FRAME_REDUCED_DECODE if reduced is None else reduced
+        # (width, height) of the last frame at full resolution
+        self.source_size = None
+        self.factor = 1
+
+    def jpeg(self, data):
+        return image_bytes(data)
+
+    def decode(self, jpeg, factor=1):
+        if not self.reduced:
+            factor = 1
+        frame = decode_jpeg(jpeg, DECODE_FLAGS[factor])
+        height, width = frame.shape[:2]
+        self.factor = factor
+        self.source_size = (width * factor, height * factor)
+        return frame
@@ -0,0 +1,42 @@
+import asyncio
+
+
+class LatestFrameSlot:
+    """Depth-1 mailbox between the socket reader and the trainer.
+
+    A frame that arrives while the previous one is still waiting replaces it,
+    so the trainer always works on the newest frame and latency stays bounded
+    when the client sends faster than we can run the pose model.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self._ready = asyncio.Event()
+        self.dropped = 0          # dropped since the last get()
+
+    def put(self, item):
+        if self._has_item:
+            self.dropped += 1
+        self._item = item
+        self._has_item = True
+        self._ready.set()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def get(self):
+        """Wait for the newest frame, returns (item, dropped) or None once closed."""
+        while not self._has_item and not self._closed:
+            self._ready.clear()
+            await self._ready.wait()
+        if self._closed:
+            # Client is gone, a pending frame has nobody to answer to
+            return None
+        item, dropped = self._item, self.dropped
+        self._item = None
+        self._has_item = False
+        self.dropped = 0
+        return item, dropped
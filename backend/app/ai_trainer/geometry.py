@@ -0,0 +1,32 @@
+import numpy as np
+
+# Array kernels over pose landmarks. `points` is shaped (..., landmarks, coords)
+# with x, y as the first two coords: (33, 4) for one frame, (frames, 33, 4) for
+# a clip. Index tuples select landmarks; results keep the leading frame axes.
+
+
+def joint_angles(points, triples):
+    """Angle at b in degrees (0-180) for every (a, b, c) index triple, shape (..., len(triples))."""
+    triples = np.asarray(triples, dtype=np.intp).reshape(-1, 3)
+    xy = np.asarray(points)[..., :2]
+    a = xy[..., triples[:, 0], :]
+    b = xy[..., triples[:, 1], :]
+    c = xy[..., triples[:, 2], :]
+    radians = np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0]) - \
+        np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0])
+    angle = np.abs(radians * 180.0 / np.pi)
+    return np.where(angle > 180.0, 360.0 - angle, angle)
+
+
+def point_distances(points, pairs):
+    """Image-plane distance between a and b for every (a, b) index pair, shape (..., len(pairs))."""
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    xy = np.asarray(points)[..., :2]
+    return np.linalg.norm(xy[..., pairs[:, 0], :] - xy[..., pairs[:, 1], :], axis=-1)
+
+
+def vertical_offsets(points, pairs):
+    """a.y - b.y for every (a, b) index pair; positive when b is above a (image y grows downwards)."""
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    y = np.asarray(points)[..., 1]
+    return y[..., pairs[:, 0]] - y[..., pairs[:, 1]]
@@ -0,0 +1,43 @@
+from app.config import settings
+
+
+class HoldMonitor:
+    """How often a hold exercise's posture needs checking.
+
+    A steady hold is verified at TRAINER_HOLD_CHECK_FPS. Before the position is
+    reached, or while any active metric is within TRAINER_HOLD_DRIFT (a fraction
+    of the threshold) of its limit or moved that much since the last check,
+    checks go up to TRAINER_HOLD_ACTIVE_FPS. Frames arriving before the next
+    check is due are answered from the clock without being decoded.
+    """
+
+    def __init__(self, spec, check_fps=None, active_fps=None, drift=None):
+        self.conditions = spec.active
+        self.check_fps = settings.TRAINER_HOLD_CHECK_FPS if check_fps is None else check_fps
+        self.active_fps = settings.TRAINER_HOLD_ACTIVE_FPS if active_fps is None else active_fps
+        self.drift = settings.TRAINER_HOLD_DRIFT if drift is None else drift
+        self.fps = self.active_fps
+        self.next_check = 0.0
+        self.last_values = None
+
+    def due(self, now):
+        return now >= self.next_check
+
+    def checked(self, in_position, values, now):
+        """Record a posture check; returns the check rate until the next one"""
+        steady = in_position and values is not None and not self._drifting(values)
+        self.fps = self.check_fps if steady else self.active_fps
+        self.last_values = values
+        # A little early, so frames sent at exactly this rate aren't skipped
+        self.next_check = now + 0.9 / self.fps
+        return self.fps
+
+    def _drifting(self, values):
+        for metric, _, threshold in self.conditions:
+            value = values[metric]
+            tolerance = self.drift * abs(threshold)
+            if abs(value - threshold) <= tolerance:
+                return True
+            if self.last_values is not None and abs(value - self.last_values[metric]) > tolerance:
+                return True
+        return False
@@ -0,0 +1,142 @@
+import cv2
+import numpy as np
+
+from app.ai_trainer.landmarks import Landmark
+from app.config import settings
+
+# Grayscale frames for optical flow are downscaled to this width
+FLOW_WIDTH = 320
+# Points tracked by optical flow need at least this visibility
+FLOW_MIN_VISIBILITY = 0.5
+LK_PARAMS = {
+    "winSize": (21, 21),
+    "maxLevel": 2,
+    "criteria": (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+}
+
+
+class KeyframeTracker:
+    """Runs pose.process only on keyframes and estimates landmarks in between.
+
+    Between keyframes the previous landmarks are moved by pyramidal
+    Lucas-Kanade optical flow ("flow") or by the per-frame velocity seen
+    between the last two keyframes ("extrapolate"). The keyframe interval
+    adapts to motion: it is about motion_budget / speed (normalized units per
+    frame), between 1 and max_interval. Fast movement goes back to every frame.
+    """
+
+    def __init__(self, max_interval=None, method=None, motion_budget=None):
+        self.max_interval = settings.TRAINER_KEYFRAME_INTERVAL if max_interval is None else max_interval
+        self.method = method or settings.TRAINER_KEYFRAME_METHOD
+        self.motion_budget = settings.TRAINER_KEYFRAME_MOTION if motion_budget is None else motion_budget
+        self.reset()
+
+    def reset(self):
+        self.interval = 1
+        self.since = 0
+        self.points = None
+        self.key_points = None
+        self.velocity = None
+        self.gray = None
+        self.keyframes = 0
+        self.estimated = 0
+
+    @property
+    def enabled(self):
+        return self.max_interval > 1
+
+    def due(self):
+        """Whether the next frame needs a full pose.process"""
+        return not self.enabled or self.points is None or self.since + 1 >= self.interval
+
+    def observe(self, frame, points):
+        """Record a keyframe's landmarks ((33, 4) full-frame array, None when nobody was found)"""
+        self.keyframes += 1
+        if points is None:
+            self.reset_motion()
+            return
+        if self.key_points is not None:
+            elapsed = self.since + 1
+            self.velocity = (points[:, :2] - self.key_points[:, :2]) / elapsed
+            self.interval = self._adapt(self._speed(self.velocity, points))
+        self.points = points
+        self.key_points = points
+        self.since = 0
+        if self.enabled and self.method == "flow":
+            self.gray = self._gray(frame)
+
+    def reset_motion(self):
+        self.points = None
+        self.key_points = None
+        self.velocity = None
+        self.gray = None
+        self.interval = 1
+        self.since = 0
+
+    def estimate(self, frame):
+        """Landmarks for an in-between frame as a list of Landmark tuples"""
+        self.since += 1
+        self.estimated += 1
+        previous = self.points
+        points = previous.copy()
+
+        moved = False
+        if self.method == "flow" and self.gray is not None:
+            gray = self._gray(frame)
+            moved = self._flow(previous, points, gray)
+            self.gray = gray
+        if not moved and self.velocity is not None:
+            points[:, :2] += self.velocity
+
+        # Drifted further than a keyframe interval is allowed to: refresh next frame
+        if self.velocity is not None:
+            drift = np.nanmean(np.abs(points[:, :2] - self.key_points[:, :2]))
+            if drift > self.motion_budget:
+                self.interval = self.since + 1
+
+        self.points = points
+        return [Landmark(*row) for row in points.tolist()]
+
+    def _flow(self, previous, points, gray):
+        height, width = gray.shape
+        if gray.shape != self.gray.shape:
+            # Client changed the frame size (see rate_control): re-detect
+            self.interval = self.since + 1
+            return False
+        tracked = previous[:, 3] >= FLOW_MIN_VISIBILITY
+        if not tracked.any():
+            return False
+        start = (previous[tracked, :2] * (width, height)).astype(np.float32).reshape(-1, 1, 2)
+        end, status, _ = cv2.calcOpticalFlowPyrLK(self.gray, gray, start, None, **LK_PARAMS)
+        ok = status.reshape(-1).astype(bool)
+        if ok.sum() < ok.size / 2:
+            # Lost track of most points: extrapolate now, full inference next frame
+            self.interval = self.since + 1
+            return False
+        moved = end.reshape(-1, 2)[ok] / (width, height)
+        indices = np.flatnonzero(tracked)[ok]
+        points[indices, :2] = moved
+        # Points flow couldn't follow move with the average of those it could
+        others = np.setdiff1d(np.arange(len(points)), indices)
+        if others.size:
+            points[others, :2] += (moved - previous[indices, :2]).mean(axis=0)
+        return True
+
+    def _gray(self, frame):
+        height, width = frame.shape[:2]
+        if width > FLOW_WIDTH:
+            frame = cv2.resize(frame, (FLOW_WIDTH, round(height * FLOW_WIDTH / width)), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def _speed(self, velocity, points):
+        visible = points[:, 3] >= FLOW_MIN_VISIBILITY
+        if not visible.any():
+            return np.inf
+        return float(np.abs(velocity[visible]).mean())
+
+    def _adapt(self, speed):
+        if not np.isfinite(speed):
+            return 1
+        if speed <= 0:
+            return self.max_interval
+        return int(max(1, min(self.max_interval, self.motion_budget / speed)))
@@ -0,0 +1,92 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Same fields as MediaPipe's NormalizedLandmark, so trainers can't tell
+# client-supplied landmarks from the ones produced by pose.process
+Landmark = namedtuple("Landmark", ["x", "y", "z", "visibility"])
+
+MISSING = Landmark(math.nan, math.nan, math.nan, 0.0)
+
+# MediaPipe Pose landmark order, camelCase like the frontend's LandmarkName
+LANDMARK_NAMES = [
+    "nose", "leftEyeInner", "leftEye", "leftEyeOuter", "rightEyeInner", "rightEye",
+    "rightEyeOuter", "leftEar", "rightEar", "mouthLeft", "mouthRight",
+    "leftShoulder", "rightShoulder", "leftElbow", "rightElbow", "leftWrist", "rightWrist",
+    "leftPinky", "rightPinky", "leftIndex", "rightIndex", "leftThumb", "rightThumb",
+    "leftHip", "rightHip", "leftKnee", "rightKnee", "leftAnkle", "rightAnkle",
+    "leftHeel", "rightHeel", "leftFootIndex", "rightFootIndex",
+]
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+NUM_LANDMARKS = len(LANDMARK_NAMES)
+
+
+def _mirror_name(name):
+    for side, other in (("left", "right"), ("right", "left"), ("Left", "Right"), ("Right", "Left")):
+        if side in name:
+            return name.replace(side, other)
+    return name
+
+
+# Index of the same point on the other side of the body (nose maps to itself)
+MIRROR_INDEX = [LANDMARK_INDEX[_mirror_name(name)] for name in LANDMARK_NAMES]
+
+
+def _to_landmark(point):
+    if isinstance(point, dict):
+        return Landmark(float(point["x"]), float(point["y"]),
+                        float(point.get("z", 0.0)), float(point.get("visibility", 1.0)))
+    x, y, *rest = point
+    z = rest[0] if len(rest) > 0 else 0.0
+    visibility = rest[1] if len(rest) > 1 else 1.0
+    return Landmark(float(x), float(y), float(z), float(visibility))
+
+
+def parse_landmarks(payload):
+    """Client landmarks to a list of 33 Landmark tuples in MediaPipe order.
+
+    Accepts a list of 33 points, either {x, y, z?, visibility?} objects (what the
+    browser's PoseLandmarker returns) or [x, y, z?, visibility?] arrays, or an
+    object keyed by name like {"leftShoulder": {"x": .., "y": ..}}, or 33 x 4
+    little-endian float32 (x, y, z, visibility) from the MessagePack
+    subprotocol. Points that are not sent come back as MISSING. Returns None
+    for an empty payload.
+    """
+    if not payload:
+        return None
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        values = np.frombuffer(payload, dtype="<f4")
+        if values.size != NUM_LANDMARKS * 4:
+            raise ValueError(f"Expected {NUM_LANDMARKS} x 4 float32 landmark values, got {values.size}")
+        return [Landmark(*row) for row in values.reshape(NUM_LANDMARKS, 4).tolist()]
+    if isinstance(payload, dict):
+        points = [MISSING] * NUM_LANDMARKS
+        for name, point in payload.items():
+            index = LANDMARK_INDEX.get(name)
+            if index is not None and point:
+                points[index] = _to_landmark(point)
+        return points
+    if len(payload) != NUM_LANDMARKS:
+        raise ValueError(f"Expected {NUM_LANDMARKS} landmarks, got {len(payload)}")
+    return [_to_landmark(point) if point else MISSING for point in payload]
+
+
+def mirror_landmarks(points):
+    """Landmarks as they'd come out of pose.process on the horizontally flipped image."""
+    return [
+        Landmark(1.0 - p.x, p.y, p.z, p.visibility)
+        for p in (points[j] for j in MIRROR_INDEX)
+    ]
+
+
+def landmark_array(landmarks):
+    """Landmarks (MediaPipe or Landmark tuples) as a (33, 4) float array of x, y, z, visibility."""
+    return np.array([(p.x, p.y, p.z, p.visibility) for p in landmarks], dtype=np.float64)
+
+
+def mirror_points(points):
+    """mirror_landmarks for a (..., 33, coords) array"""
+    mirrored = np.array(points, dtype=np.float64)[..., MIRROR_INDEX, :]
+    mirrored[..., 0] = 1.0 - mirrored[..., 0]
+    return mirrored
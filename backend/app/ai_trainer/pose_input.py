@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+
+from app.config import settings
+
+# Fewer landmarks at or above ROI_MIN_VISIBILITY and the next frame goes in uncropped
+ROI_MIN_VISIBILITY = 0.5
+ROI_MIN_POINTS = 6
+
+
+class PoseInput:
+    """Per-session preprocessing in front of pose.process.
+
+    Crops the frame to the area around the previous frame's landmarks and
+    downscales it to the model's working resolution, so big webcam frames
+    cost no more than the model can use. map_landmarks() puts the results
+    back into full-frame coordinates, so trainers see the same numbers as
+    before.
+    """
+
+    def __init__(self, max_side=None, roi=None, margin=None):
+        self.max_side = settings.POSE_INPUT_SIZE if max_side is None else max_side
+        if roi is None:
+            # The stub backend ignores the image and answers in full-frame coordinates,
+            # which map_landmarks would wrongly stretch as if they were crop-relative
+            roi = settings.POSE_ROI and settings.POSE_BACKEND != "stub"
+        self.use_roi = roi
+        self.margin = settings.POSE_ROI_MARGIN if margin is None else margin
+        # (x0, y0, x1, y1) as fractions of the frame, None for the whole frame; normalized
+        # so it still applies when the frame arrives at another size or decode scale
+        self.roi = None
+        self._crop = None
+        # RGB image handed to pose.process, reused while the crop size stays the same
+        # (pose.process copies it into the graph)
+        self._rgb = None
+
+    def prepare(self, frame):
+        """RGB image for pose.process: ROI crop, then downscale to max_side"""
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self._pixels(self.roi, width, height) if self.roi else (0, 0, width, height)
+        self._crop = (x0, y0, x1 - x0, y1 - y0, width, height)
+        image = frame[y0:y1, x0:x1]
+
+        longest = max(image.shape[:2])
+        if self.max_side and longest > self.max_side:
+            scale = self.max_side / longest
+            size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        if self._rgb is None or self._rgb.shape != image.shape:
+            self._rgb = np.empty_like(image)
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb)
+
+    def reduction(self, source_size, factors=(8, 4, 2)):
+        """Largest JPEG decode reduction that still gives the model max_side pixels of crop.
+
+        source_size is the (width, height) of frames at full resolution; 1 when
+        unknown or when nothing can be saved.
+        """
+        if not source_size or not self.max_side:
+            return 1
+        width, height = source_size
+        x0, y0, x1, y1 = self._pixels(self.roi, width, height) if self.roi else (0, 0, width, height)
+        longest = max(x1 - x0, y1 - y0)
+        for factor in factors:
+            if longest / factor >= self.max_side:
+                return factor
+        return 1
+
+    def _pixels(self, roi, width, height):
+        x0, y0, x1, y1 = roi
+        return round(x0 * width), round(y0 * height), round(x1 * width), round(y1 * height)
+
+    def map_landmarks(self, landmarks):
+        """Rewrite crop-relative landmarks in place as full-frame normalized coordinates"""
+        x0, y0, crop_width, crop_height, width, height = self._crop
+        if (crop_width, crop_height) == (width, height):
+            return landmarks
+        for lm in landmarks:
+            lm.x = (x0 + lm.x * crop_width) / width
+            lm.y = (y0 + lm.y * crop_height) / height
+            lm.z = lm.z * crop_width / width
+        return landmarks
+
+    def update(self, landmarks):
+        """Pick the next frame's ROI from this frame's (full-frame) landmarks.
+
+        Returns True when the ROI moved, since the Pose graph's own tracking
+        state refers to the old crop.
+        """
+        if not self.use_roi:
+            return False
+        _, _, _, _, width, height = self._crop
+        roi = None
+        visible = sum(1 for lm in landmarks or () if lm.visibility >= ROI_MIN_VISIBILITY)
+        if visible >= ROI_MIN_POINTS:
+            # All points, including occluded ones the model still places, so limbs
+            # that are hidden for a moment aren't cropped away
+            xs = [min(max(lm.x, 0.0), 1.0) * width for lm in landmarks]
+            ys = [min(max(lm.y, 0.0), 1.0) * height for lm in landmarks]
+            box = (min(xs), min(ys), max(xs), max(ys))
+            if self.roi and self._contains(self._pixels(self.roi, width, height), box, width, height):
+                # Keep the crop stable while the body stays well inside it
+                return False
+            pad = self.margin * max(box[2] - box[0], box[3] - box[1])
+            roi = (
+                max(0, int(box[0] - pad)), max(0, int(box[1] - pad)),
+                min(width, int(box[2] + pad)), min(height, int(box[3] + pad)),
+            )
+            if roi[2] - roi[0] < 2 or roi[3] - roi[1] < 2:
+                roi = None
+            else:
+                roi = (roi[0] / width, roi[1] / height, roi[2] / width, roi[3] / height)
+        changed = roi != self.roi
+        self.roi = roi
+        return changed
+
+    def _contains(self, roi, box, width, height):
+        # Body box inside the ROI with half the margin to spare (edges on the frame
+        # border don't count), and the ROI not much bigger than a fresh one would be
+        x0, y0, x1, y1 = roi
+        longest = max(box[2] - box[0], box[3] - box[1])
+        slack = self.margin / 2 * longest
+        inside = ((x0 == 0 or box[0] - slack >= x0) and (y0 == 0 or box[1] - slack >= y0) and
+                  (x1 == width or box[2] + slack <= x1) and (y1 == height or box[3] + slack <= y1))
+        snug = max(x1 - x0, y1 - y0) <= 1.5 * longest * (1 + 2 * self.margin)
+        return inside and snug
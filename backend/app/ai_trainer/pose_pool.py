@@ -0,0 +1,165 @@
+import threading
+import time
+
+from app.config import settings
+
+DEFAULT_POSE_OPTIONS = {"min_detection_confidence": 0.5, "min_tracking_confidence": 0.5}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _create_pose(options):
+    if settings.POSE_BACKEND == "stub":
+        from app.ai_trainer.stub_pose import StubPose
+        return StubPose(**options)
+    # Imported here so loading the app doesn't pay for mediapipe until a graph is needed
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(**options)
+
+
+class PosePool:
+    """Lazily grown pool of MediaPipe Pose graphs.
+
+    A session checks a graph out for its lifetime and returns it on close, so
+    the number of graphs follows the number of active sessions (capped at
+    ``size``) instead of the number of exercise modules. Live sessions use
+    try_acquire(), which never waits; acquire() blocks the calling thread and
+    is meant for offline work on its own threads.
+    """
+
+    def __init__(self, size=None, timeout=None, **pose_options):
+        self.size = max(1, size or settings.POSE_POOL_SIZE)
+        self.timeout = settings.POSE_POOL_TIMEOUT if timeout is None else timeout
+        self.pose_options = {**DEFAULT_POSE_OPTIONS, **pose_options}
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+        # Stats
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._busy = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self, timeout=None):
+        """Check out a graph, waiting up to timeout seconds (PoolTimeout after that)"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        create = False
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._created >= self.size:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No free pose graph after {timeout:.1f}s ({self.size} in use)")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    pose = self._idle.pop()
+                else:
+                    # Reserve the slot now, build the graph outside the lock
+                    self._created += 1
+                    create = True
+            finally:
+                self._waiting -= 1
+            waited = time.monotonic() - start
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        if create:
+            pose = self._build()
+        return pose
+
+    def try_acquire(self):
+        """A graph if one is idle or can still be built, None right away if the pool is full"""
+        with self._cond:
+            if self._idle:
+                self._checkouts += 1
+                return self._idle.pop()
+            if self._created >= self.size:
+                self._busy += 1
+                return None
+            # Reserve the slot now, build the graph outside the lock
+            self._created += 1
+            self._checkouts += 1
+        return self._build()
+
+    def _build(self):
+        # The caller has reserved a slot in _created; give it back if the graph can't be built
+        try:
+            return _create_pose(self.pose_options)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def warm(self, count):
+        """Build idle graphs up front so the first sessions skip graph setup."""
+        while True:
+            with self._cond:
+                if self._created >= min(count, self.size):
+                    return
+                self._created += 1
+            pose = self._build()
+            with self._cond:
+                self._idle.append(pose)
+                self._cond.notify()
+
+    def release(self, pose):
+        # Drop tracking context from the previous session before reuse
+        reset = getattr(pose, "reset", None)
+        if reset is not None:
+            reset()
+        with self._cond:
+            self._idle.append(pose)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._created - idle,
+                "idle": idle,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "busy": self._busy,
+                "avg_wait_ms": round(1000 * self._wait_total / self._checkouts, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(1000 * self._wait_max, 3),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pose_pool(**pose_options):
+    """Process-wide pool for the given Pose options (one pool per distinct configuration)."""
+    key = tuple(sorted(pose_options.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = PosePool(**pose_options)
+        return pool
+
+
+def pose_pool_for(model_complexity=None):
+    """Pool for a model complexity, settings.POSE_MODEL_COMPLEXITY when None."""
+    if model_complexity is None:
+        model_complexity = settings.POSE_MODEL_COMPLEXITY
+    return get_pose_pool(model_complexity=model_complexity)
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.items())
+    return [{"options": dict(key), **pool.stats()} for key, pool in pools]
@@ -0,0 +1,87 @@
+import time
+
+from app.config import settings
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.2
+
+
+class RateController:
+    """Per-session frame rate / frame size hints from the server's own latency.
+
+    record() is called once per processed frame with how long the frame waited
+    and how long it took. Every CONTROL_INTERVAL seconds the target is revised:
+    over TARGET_LATENCY the fps is cut multiplicatively (then the frame size,
+    once fps is at its floor); well under it, with nothing dropped, the size
+    and then the fps creep back up. update() returns a control message when
+    the target changed, else None.
+    """
+
+    def __init__(self):
+        self.target_latency = settings.TRAINER_TARGET_LATENCY_MS / 1000
+        self.min_fps = settings.TRAINER_MIN_FPS
+        self.max_fps = settings.TRAINER_MAX_FPS
+        self.widths = sorted(settings.TRAINER_FRAME_WIDTHS)
+        self.interval = settings.TRAINER_CONTROL_INTERVAL
+
+        self.fps = min(settings.TRAINER_START_FPS, self.max_fps)
+        self.width_index = len(self.widths) - 1
+        self.latency = None
+        self.processing = None
+        self.dropped = 0
+        # Rate the trainer itself asks for (e.g. hold checks), None for no limit
+        self.ceiling = None
+        self._last_update = time.monotonic()
+        self._sent = None
+
+    @property
+    def max_width(self):
+        return self.widths[self.width_index]
+
+    def _average(self, current, sample):
+        return sample if current is None else current + EWMA_ALPHA * (sample - current)
+
+    def record(self, latency, processing, dropped=0):
+        """latency: receive -> result sent, processing: time in the trainer (seconds)"""
+        self.latency = self._average(self.latency, latency)
+        self.processing = self._average(self.processing, processing)
+        self.dropped += dropped
+
+    def limit(self, fps):
+        """Cap the hinted fps at what the trainer needs; a change is sent on the next update()"""
+        if fps != self.ceiling:
+            self.ceiling = fps
+            self._last_update = 0.0
+
+    def update(self):
+        now = time.monotonic()
+        if self._sent is not None and now - self._last_update < self.interval:
+            return None
+        self._last_update = now
+
+        if self.latency is not None:
+            # One frame per session is in flight at a time, so the trainer can't
+            # go faster than 1 / processing time
+            capacity = 1.0 / max(self.processing, 1e-3)
+            if self.latency > self.target_latency or self.dropped:
+                if self.fps > self.min_fps:
+                    self.fps = max(self.min_fps, min(self.fps * 0.75, capacity))
+                elif self.width_index > 0:
+                    self.width_index -= 1
+            elif self.latency < self.target_latency / 2:
+                if self.width_index < len(self.widths) - 1:
+                    self.width_index += 1
+                else:
+                    self.fps = max(self.min_fps, min(self.max_fps, self.fps + 1, capacity))
+            self.dropped = 0
+
+        fps = self.fps if self.ceiling is None else min(self.fps, self.ceiling)
+        control = {"fps": round(fps, 1), "max_width": self.max_width}
+        if control == self._sent:
+            return None
+        self._sent = control
+        message = dict(control)
+        if self.latency is not None:
+            message["latency_ms"] = round(self.latency * 1000, 1)
+            message["processing_ms"] = round(self.processing * 1000, 1)
+        return {"control": message}
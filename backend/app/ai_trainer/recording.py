@@ -0,0 +1,105 @@
+"""Per-frame recordings of trainer sessions, for replay and regression tests.
+
+A recording is two files sharing a name under settings.TRAINER_RECORD_DIR:
+
+  <name>.npy   one RECORD_DTYPE row per processed frame; np.load(..., mmap_mode="r")
+               maps it without reading it
+  <name>.json  exercise, stations, frame count, format
+
+Landmarks are stored the way the counter saw them (selfie view, full-frame
+coordinates), so replaying them through RepCounter.replay reproduces the
+session without the camera or the pose model (see benchmarks.replay_sessions).
+"""
+import json
+import math
+import os
+import secrets
+import shutil
+import time
+
+import numpy as np
+
+from app.ai_trainer.landmarks import NUM_LANDMARKS, landmark_array
+
+RECORDING_FORMAT = "fitflow.recording.v1"
+
+RECORD_DTYPE = np.dtype([
+    # The session's monotonic clock in seconds, exactly what the counter was given, so
+    # hold timers replay bit for bit (subtract the first row for time into the session)
+    ("time", "<f8"),
+    # False where nobody was detected; landmarks are NaN then
+    ("present", "?"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, 4)),
+    # The exercise's primary metric (angle, distance, ...), NaN when not measured
+    ("metric", "<f4"),
+    # Reps, or seconds held for hold exercises, after this frame
+    ("count", "<i4"),
+])
+
+# Rows are copied from the .part file into the .npy this many bytes at a time
+COPY_CHUNK_BYTES = 1 << 20
+
+
+class SessionRecorder:
+    """Appends one record per frame to <path>.part; close() turns it into <path>.npy + <path>.json.
+
+    Records are written through a buffered file as they come, so a long
+    session never holds more than a few frames in memory.
+    """
+
+    def __init__(self, path, info=None):
+        self.path = path
+        self.info = dict(info or {})
+        self.frames = 0
+        self._row = np.zeros(1, dtype=RECORD_DTYPE)
+        self._file = open(path + ".part", "wb")
+
+    def add(self, landmarks, result, now=None):
+        """Record one frame: the counter's input landmarks (None when nobody is visible) and its result"""
+        row = self._row[0]
+        row["time"] = time.monotonic() if now is None else now
+        row["present"] = bool(landmarks)
+        row["landmarks"] = landmark_array(landmarks) if landmarks else math.nan
+        metric = result.get("angle", result.get("metric"))
+        row["metric"] = math.nan if metric is None else metric
+        row["count"] = int(result.get("count", result.get("time")) or 0)
+        self._file.write(self._row.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        part = self.path + ".part"
+        # The .part file already holds the rows as .npy stores them: write the header,
+        # then stream the rows after it, so closing never reads the session into memory
+        header = {"descr": np.lib.format.dtype_to_descr(RECORD_DTYPE), "fortran_order": False,
+                  "shape": (self.frames,)}
+        with open(part, "rb") as rows, open(self.path + ".npy", "wb") as out:
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(rows, out, COPY_CHUNK_BYTES)
+        os.remove(part)
+        with open(self.path + ".json", "w") as f:
+            json.dump(dict(self.info, frames=self.frames, format=RECORDING_FORMAT), f, indent=2)
+        print(f"📼 Recorded {self.frames} frames to {self.path}.npy")
+
+
+def new_recorder(directory, info):
+    """Recorder for a new session, named <exercise>-<date>-<time>-<random>"""
+    os.makedirs(directory, exist_ok=True)
+    name = f"{info.get('exercise') or 'session'}-{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+    return SessionRecorder(os.path.join(directory, name), info)
+
+
+def load_recording(path):
+    """(records, info) of a recording; path with or without the .npy / .json extension"""
+    base = path[:-len(".npy")] if path.endswith(".npy") else path[:-len(".json")] if path.endswith(".json") else path
+    records = np.load(base + ".npy", mmap_mode="r")
+    if records.dtype != RECORD_DTYPE:
+        raise ValueError(f"{base}.npy is not a trainer recording")
+    info = {}
+    if os.path.exists(base + ".json"):
+        with open(base + ".json") as f:
+            info = json.load(f)
+    return records, info
@@ -0,0 +1,200 @@
+import functools
+
+from app.ai_trainer.pose_pool import pose_pool_for
+from app.ai_trainer.rep_engine import Angle, Distance, ExerciseSpec, Rise, VerticalGap
+
+# Exercise name (as used in /ws/ai_trainer/{exercise_name}) -> spec for the rep engine.
+# Adding an exercise is adding an entry here. Fast cardio moves with coarse distance
+# thresholds use the lite Pose model (model_complexity=0).
+EXERCISES = {
+    "squats": ExerciseSpec(
+        name="squats",
+        metrics={"angle": Angle("leftHip", "leftKnee", "leftAnkle")},
+        active=[("angle", "<=", 90)],
+        rest=[("angle", ">=", 160)],
+        set_length=30,
+        feedback={"active": "Go down!", "rest": "Stand tall"},
+    ),
+    "lunges": ExerciseSpec(
+        name="lunges",
+        metrics={"angle": Angle("leftHip", "leftKnee", "leftAnkle")},
+        active=[("angle", "<", 100)],
+        rest=[("angle", ">", 160)],
+        count_on="exit",
+        set_length=30,
+        feedback={"active": "Go down into lunge", "rest": "Push back up!"},
+        # 🔹 Show knee angle for debugging
+        overlay=("Reps: {count}", "{feedback}", "Angle: {angle:.0f}°"),
+    ),
+    "stepup": ExerciseSpec(
+        name="stepup",
+        metrics={"angle": Angle("leftHip", "leftKnee", "leftAnkle")},
+        active=[("angle", "<=", 120)],
+        rest=[("angle", ">=", 160)],
+        set_length=30,
+        feedback={"active": "Step up!", "rest": "Lower back down"},
+    ),
+    "wallsits": ExerciseSpec(
+        name="wallsits",
+        metrics={"angle": Angle("leftHip", "leftKnee", "leftAnkle")},
+        # 🔹 Thighs about parallel to the floor
+        active=[("angle", ">=", 70), ("angle", "<=", 110)],
+        mode="hold",
+        # No set length: a circuit station ends after this many seconds
+        target=45,
+        feedback={
+            "idle": "Align properly within frame",
+            "holding": "Hold it! Thighs parallel.",
+            "lost": "Posture lost! Timer paused.",
+        },
+        overlay=("Time: {time}s", "{feedback}"),
+    ),
+    "calfraise": ExerciseSpec(
+        name="Calf Raise",
+        metrics={"metric": VerticalGap("leftAnkle", "leftKnee")},
+        active=[("metric", ">", 0.15)],   # Standing tall (heels lifted)
+        rest=[("metric", "<", 0.10)],     # Lowered down
+        set_length=30,
+        feedback={"active": "Hold the top position!", "rest": "Go up slowly"},
+    ),
+    "plank": ExerciseSpec(
+        name="plank",
+        metrics={"angle": Angle("leftShoulder", "leftHip", "leftAnkle")},
+        # 🔹 Body close to a straight line
+        active=[("angle", ">=", 165), ("angle", "<=", 195)],
+        mode="hold",
+        set_length=45,
+        feedback={
+            "idle": "Align body straight and stay visible",
+            "holding": "Hold steady! Core tight.",
+            "lost": "Posture lost! Timer paused.",
+            "complete": "✅ 45s complete! Resetting...",
+        },
+        overlay=("Time: {time}s", "{feedback}"),
+    ),
+    "pushups": ExerciseSpec(
+        name="push-ups",
+        metrics={"angle": Angle("leftShoulder", "leftElbow", "leftWrist")},
+        active=[("angle", "<", 70)],
+        rest=[("angle", ">", 150)],
+        count_on="exit",
+        target=15,
+        feedback={"tracking": "Keep elbows at 45° and avoid flaring out."},
+        extra={"exercise": "push-ups", "form_score": 90},
+    ),
+    "crunches": ExerciseSpec(
+        name="crunches",
+        # 🔹 Hip angle (core flexion)
+        metrics={"angle": Angle("leftShoulder", "leftHip", "leftKnee")},
+        active=[("angle", "<", 100)],
+        rest=[("angle", ">", 140)],
+        set_length=30,
+        feedback={"active": "Crunch up! Engage core!", "rest": "Return slowly"},
+    ),
+    "bicepcurls": ExerciseSpec(
+        name="bicepcurls",
+        metrics={"angle": Angle("leftShoulder", "leftElbow", "leftWrist")},
+        active=[("angle", "<=", 40)],
+        rest=[("angle", ">=", 160)],
+        set_length=30,
+        feedback={"active": "Curl up!", "rest": "Lower slowly"},
+    ),
+    "tricepdips": ExerciseSpec(
+        name="tricepdips",
+        metrics={"angle": Angle("leftShoulder", "leftElbow", "leftWrist")},
+        active=[("angle", "<=", 90)],
+        rest=[("angle", ">=", 160)],
+        set_length=30,
+        feedback={"active": "Push up!", "rest": "Go down slowly"},
+    ),
+    "jumpingjacks": ExerciseSpec(
+        name="jumpingjacks",
+        metrics={
+            "metric": Distance("leftWrist", "rightWrist"),
+            "feet": Distance("leftAnkle", "rightAnkle"),
+        },
+        # 🔹 Arms up and legs apart -> active, arms down and legs together -> rest
+        active=[("metric", ">", 0.45), ("feet", ">", 0.3)],
+        rest=[("metric", "<", 0.25), ("feet", "<", 0.15)],
+        set_length=30,
+        feedback={"active": "Great form!", "rest": "Jump and raise arms!"},
+        model_complexity=0,
+    ),
+    "mountainclimbers": ExerciseSpec(
+        name="mountainclimbers",
+        metrics={"metric": VerticalGap("leftKnee", "leftWrist")},
+        active=[("metric", "<", 0.15)],   # Knee close to wrist (climb up)
+        rest=[("metric", ">", 0.35)],     # Leg extended back (climb down)
+        set_length=40,
+        feedback={"active": "Drive knee forward!", "rest": "Extend leg back"},
+        model_complexity=0,
+    ),
+    "jumprope": ExerciseSpec(
+        name="jumprope",
+        # Vertical difference hip y - average ankle y
+        metrics={"metric": Rise("leftHip", ("leftAnkle", "rightAnkle"))},
+        active=[("metric", "<", 0.35)],   # feet lifted from ground
+        rest=[("metric", ">", 0.45)],     # standing normally
+        set_length=100,
+        feedback={"active": "Nice jump!", "rest": "Prepare to jump"},
+        model_complexity=0,
+    ),
+    "highknee": ExerciseSpec(
+        name="highknees",
+        # 🔹 Knee height relative to hip (using left leg)
+        metrics={"metric": Rise("leftHip", "leftKnee")},
+        active=[("metric", ">", 0.18)],
+        rest=[("metric", "<", 0.05)],
+        set_length=30,
+        feedback={"active": "Good knee lift!", "rest": "Lift your knee higher!"},
+        model_complexity=0,
+    ),
+    "buttkicks": ExerciseSpec(
+        name="Butt Kicks",
+        # Heel height relative to hip
+        metrics={"metric": Rise("leftHip", "leftHeel")},
+        active=[("metric", ">", 0.05)],
+        rest=[("metric", "<", 0.02)],
+        set_length=30,
+        feedback={"active": "Kick up!", "rest": "Lower slowly"},
+        model_complexity=0,
+    ),
+}
+
+
+# /ws/ai_trainer/circuit?exercises=squats,lunges runs several of the above in one session
+CIRCUIT = "circuit"
+
+
+def normalize_name(exercise_name):
+    """Normalize name (remove spaces, lower)"""
+    return exercise_name.replace(" ", "").lower()
+
+
+def get_trainer_class(exercise_name):
+    """Trainer factory for an exercise (picklable, for process workers). None if unknown."""
+    name = normalize_name(exercise_name)
+    if name == CIRCUIT:
+        from app.ai_trainer.circuit import CircuitTrainer
+        return CircuitTrainer
+    spec = EXERCISES.get(name)
+    if spec is None:
+        return None
+    # Imported on first use so mediapipe only loads once a trainer is needed
+    from app.ai_trainer.base_trainer import SpecTrainer
+    return functools.partial(SpecTrainer, spec)
+
+
+def prewarm(exercise_names):
+    """Check the given exercises and build one Pose graph per model they use ahead of the first session."""
+    complexities = set()
+    for name in exercise_names:
+        if not name:
+            continue
+        spec = EXERCISES.get(normalize_name(name))
+        if spec is None:
+            print(f"⚠️ Cannot prewarm unknown exercise: {name}")
+            continue
+        complexities.add(spec.model_complexity)
+    for model_complexity in complexities:
+        pose_pool_for(model_complexity).warm(1)
@@ -0,0 +1,256 @@
+import operator
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from app.ai_trainer.geometry import joint_angles, point_distances, vertical_offsets
+from app.ai_trainer.landmarks import LANDMARK_INDEX, NUM_LANDMARKS
+
+# Points in metric definitions are landmark names ("leftKnee"), or a tuple of
+# names whose average position is used (e.g. both ankles).
+
+# Joint angle at b in degrees (0-180) between b->a and b->c
+Angle = namedtuple("Angle", ["a", "b", "c"])
+# Euclidean distance between two points in the image plane
+Distance = namedtuple("Distance", ["a", "b"])
+# Vertical distance between two points, regardless of which is higher
+VerticalGap = namedtuple("VerticalGap", ["a", "b"])
+# How far point is above base (negative when below); image y grows downwards
+Rise = namedtuple("Rise", ["base", "point"])
+
+
+class MetricPlan:
+    """Metrics of a spec resolved to landmark indices, computed with one kernel call per kind.
+
+    Works on a single frame (33, coords) or a whole clip (frames, 33, coords).
+    """
+
+    def __init__(self, metrics):
+        self.names = list(metrics)
+        # Averaged points are appended after the 33 landmarks
+        self.virtual = []
+        groups = {Angle: [], Distance: [], VerticalGap: [], Rise: []}
+        for column, metric in enumerate(metrics.values()):
+            groups[type(metric)].append((column, [self._index(ref) for ref in metric]))
+        self.groups = [
+            (kind, [column for column, _ in items], np.array([indices for _, indices in items], dtype=np.intp))
+            for kind, items in groups.items() if items
+        ]
+
+    def _index(self, ref):
+        if not isinstance(ref, tuple):
+            return LANDMARK_INDEX[ref]
+        members = [LANDMARK_INDEX[name] for name in ref]
+        if members not in self.virtual:
+            self.virtual.append(members)
+        return NUM_LANDMARKS + self.virtual.index(members)
+
+    def compute(self, points):
+        """Array of shape (..., len(metrics)), columns in spec order"""
+        points = np.asarray(points, dtype=np.float64)[..., :2]
+        if self.virtual:
+            extra = np.stack([points[..., members, :].mean(axis=-2) for members in self.virtual], axis=-2)
+            points = np.concatenate([points, extra], axis=-2)
+        values = np.empty(points.shape[:-2] + (len(self.names),))
+        for kind, columns, indices in self.groups:
+            if kind is Angle:
+                values[..., columns] = joint_angles(points, indices)
+            elif kind is Distance:
+                values[..., columns] = point_distances(points, indices)
+            elif kind is VerticalGap:
+                values[..., columns] = np.abs(vertical_offsets(points, indices))
+            else:
+                values[..., columns] = vertical_offsets(points, indices)
+        return values
+
+
+OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+# One exercise as data:
+#   metrics     name -> Angle/Distance/VerticalGap/Rise; the first one is reported in results
+#   active      (metric, op, threshold) conditions that must all hold in the working position
+#   rest        same for the starting position; the gap between the two is the hysteresis
+#   mode        "reps" counts active/rest cycles, "hold" times how long active is held
+#   count_on    "enter" counts when active is reached, "exit" when rest is reached again after it
+#   set_length  reps (or seconds for holds) after which the counter resets, None to never reset
+#   feedback    idle (nobody visible), tracking (visible, between positions), active, rest,
+#               complete and, for holds, holding/lost
+#   overlay     text lines drawn on the annotated frame, formatted with the result
+#   extra       constant fields added to every result
+#   model_complexity  MediaPipe Pose model for this exercise, None for the configured default
+#   target      reps (seconds for holds) that finish a circuit station when the client sets
+#               no target, None for set_length
+ExerciseSpec = namedtuple(
+    "ExerciseSpec",
+    ["name", "metrics", "active", "rest", "mode", "count_on", "set_length", "feedback", "overlay", "extra",
+     "model_complexity", "target"],
+    defaults=((), "reps", "enter", None, {}, ("Reps: {count}", "{feedback}"), {}, None, None),
+)
+
+DEFAULT_FEEDBACK = {
+    "idle": "Stay visible in frame",
+    "complete": "Set complete! Resetting...",
+}
+
+
+def _holds(conditions, values):
+    return bool(conditions) and all(OPS[op](values[metric], threshold) for metric, op, threshold in conditions)
+
+
+class RepCounter:
+    """Counter state for one exercise spec, updated once per frame from a landmark array."""
+
+    def __init__(self, spec, auto_reset=True):
+        self.spec = spec
+        # Reps / seconds after which the counter starts over; None when the caller
+        # (a circuit with its own station targets) decides when a set ends
+        self.set_length = spec.set_length if auto_reset else None
+        self.feedback = dict(DEFAULT_FEEDBACK, **spec.feedback)
+        self.plan = MetricPlan(spec.metrics)
+        self.metric_name = self.plan.names[0]
+        self.reset()
+
+    def reset(self):
+        """Reset count, direction and hold timer"""
+        self.count = 0
+        self.direction = 0
+        self.started = False
+        self.start_time = None
+        self.duration = 0
+        self.in_position = False
+        self._start_wall = (None, None)
+
+    def state(self):
+        """Counter state as plain data (live sessions, for the session store)"""
+        if self.start_time is None:
+            start_wall = None
+        elif self._start_wall[0] == self.start_time:
+            start_wall = self._start_wall[1]
+        else:
+            # Hold start as wall-clock time: another node's monotonic clock can't use ours
+            start_wall = time.time() - (time.monotonic() - self.start_time)
+            self._start_wall = (self.start_time, start_wall)
+        return {
+            "count": self.count,
+            "direction": self.direction,
+            "started": self.started,
+            "start_wall": start_wall,
+            "duration": self.duration,
+            "in_position": self.in_position,
+        }
+
+    def restore(self, state):
+        """Continue from a state() taken by this or another process"""
+        self.reset()
+        self.count = state["count"]
+        self.direction = state["direction"]
+        self.started = state["started"]
+        self.duration = state["duration"]
+        self.in_position = state["in_position"]
+        if state["start_wall"] is not None:
+            self.start_time = time.monotonic() - (time.time() - state["start_wall"])
+            self._start_wall = (self.start_time, state["start_wall"])
+
+    def measure(self, points):
+        """Every metric of the spec from one (33, coords) landmark array"""
+        return dict(zip(self.plan.names, self.plan.compute(points).tolist()))
+
+    def update(self, points, now=None):
+        """Advance the counter by one frame; points is None when nobody is visible."""
+        return self.step(self.measure(points) if points is not None else None, now)
+
+    def replay(self, points, present=None, timestamps=None):
+        """Run a whole (frames, 33, coords) clip: metrics in one batch, then the counter per frame.
+
+        present is a per-frame bool mask, False where nobody was detected;
+        timestamps (seconds) drive hold timers instead of the wall clock.
+        """
+        table = self.plan.compute(points).tolist()
+        if present is None:
+            present = [True] * len(table)
+        if timestamps is None:
+            timestamps = [None] * len(table)
+        return [
+            self.step(dict(zip(self.plan.names, row)) if seen else None, now)
+            for row, seen, now in zip(table, present, timestamps)
+        ]
+
+    def step(self, values, now=None):
+        """Advance the counter with precomputed metric values (None when nobody is visible).
+
+        now is the frame time in seconds for hold timers, the monotonic clock when None.
+        """
+        if self.spec.mode == "hold":
+            result = self._update_hold(values, time.monotonic() if now is None else now)
+        else:
+            result = self._update_reps(values)
+        result[self.metric_name] = values[self.metric_name] if values else None
+        result.update(self.spec.extra)
+        return result
+
+    def elapsed(self, now=None):
+        """Hold time by the clock alone, for frames between posture checks"""
+        if not self.in_position or self.start_time is None:
+            return self.duration
+        duration = int((time.monotonic() if now is None else now) - self.start_time)
+        if self.set_length is not None:
+            duration = min(duration, self.set_length)
+        return duration
+
+    def _update_reps(self, values):
+        feedback = self.feedback["idle"]
+
+        # 🔹 Auto reset after completing one set
+        if self.set_length is not None and self.count >= self.set_length:
+            feedback = self.feedback["complete"]
+            print(f"🔁 {self.spec.name} counter reset to 0")
+            self.reset()
+
+        if values is not None:
+            feedback = self.feedback.get("tracking", feedback)
+            if _holds(self.spec.active, values):
+                feedback = self.feedback.get("active", feedback)
+                if self.direction == 0:
+                    self.direction = 1
+                    if self.spec.count_on == "enter":
+                        self.count += 1
+            elif _holds(self.spec.rest, values):
+                feedback = self.feedback.get("rest", feedback)
+                if self.direction == 1:
+                    self.direction = 0
+                    if self.spec.count_on == "exit":
+                        self.count += 1
+
+        return {"count": self.count, "feedback": feedback}
+
+    def _update_hold(self, values, now):
+        feedback = self.feedback["idle"]
+        duration = self.duration
+
+        if values is not None:
+            # 🔹 Timer runs while the active position is held
+            if _holds(self.spec.active, values):
+                if not self.in_position:
+                    self.in_position = True
+                    if not self.started:
+                        self.started = True
+                        self.start_time = now
+                        print(f"🟢 {self.spec.name} started")
+                else:
+                    self.duration = int(now - self.start_time)
+                    feedback = self.feedback.get("holding", feedback)
+            elif self.in_position:
+                feedback = self.feedback.get("lost", feedback)
+                self.in_position = False
+
+            duration = self.duration
+
+            # 🔹 Auto reset after one full hold
+            if self.set_length is not None and duration >= self.set_length:
+                feedback = self.feedback["complete"]
+                print(f"🔁 {self.spec.name} timer reset")
+                self.reset()
+
+        return {"time": duration, "feedback": feedback}
+
@@ -0,0 +1,151 @@
+"""Where trainer sessions keep their state between connections.
+
+A session opened with ?session=<id> saves its counter state (see
+FrameTrainer.state) here whenever it changes, and a later connection with
+the same id, on any worker sharing the store, picks up from it.
+
+  memory   this process only (single worker)
+  manager  one store served over TCP by multiprocessing.managers, shared by
+           every uvicorn worker / node that can reach it:
+
+               python -m app.ai_trainer.session_store
+
+Values are plain dicts and lists. The manager protocol pickles them, so
+keep SESSION_STORE_ADDRESS on a trusted network. SESSION_STORE_AUTHKEY has no
+default: neither the store nor its clients start without one.
+"""
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+from app.config import settings
+
+
+class MemorySessionStore:
+    """Session states in a dict, dropped after ttl seconds without a write"""
+
+    def __init__(self, ttl=None):
+        self.ttl = settings.SESSION_STORE_TTL if ttl is None else ttl
+        self._states = {}
+        self._lock = threading.Lock()
+        self._next_purge = time.monotonic() + self.ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is None:
+                return None
+            expires, state = entry
+            if expires < time.monotonic():
+                del self._states[key]
+                return None
+            return state
+
+    def put(self, key, state):
+        now = time.monotonic()
+        with self._lock:
+            self._states[key] = (now + self.ttl, state)
+            if now >= self._next_purge:
+                self._states = {k: v for k, v in self._states.items() if v[0] >= now}
+                self._next_purge = now + self.ttl
+
+    def delete(self, key):
+        with self._lock:
+            self._states.pop(key, None)
+
+    def size(self):
+        with self._lock:
+            return len(self._states)
+
+
+_served_store = None
+
+
+def _serve_store():
+    # Runs in the store server: every client proxy talks to this one instance
+    global _served_store
+    if _served_store is None:
+        _served_store = MemorySessionStore()
+    return _served_store
+
+
+class _StoreManager(BaseManager):
+    pass
+
+
+_StoreManager.register("store", callable=_serve_store)
+
+
+def _address(address):
+    host, _, port = (address or settings.SESSION_STORE_ADDRESS).rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _authkey(authkey):
+    key = authkey or settings.SESSION_STORE_AUTHKEY
+    if not key:
+        raise ValueError("SESSION_STORE_AUTHKEY must be set for the manager session store")
+    return key.encode()
+
+
+class ManagerSessionStore:
+    """Client of the store server; same methods as MemorySessionStore.
+
+    Proxies open one connection per thread, so it's safe to use from the
+    event loop's worker threads.
+    """
+
+    def __init__(self, address=None, authkey=None):
+        self._manager = _StoreManager(address=_address(address), authkey=_authkey(authkey))
+        self._manager.connect()
+        self._store = self._manager.store()
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def put(self, key, state):
+        self._store.put(key, state)
+
+    def delete(self, key):
+        self._store.delete(key)
+
+    def size(self):
+        return self._store.size()
+
+
+SESSION_STORES = {"memory": MemorySessionStore, "manager": ManagerSessionStore}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Process-wide store selected by settings.SESSION_STORE"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            kind = settings.SESSION_STORE
+            if kind not in SESSION_STORES:
+                raise ValueError(f"Unknown SESSION_STORE: {kind}")
+            _store = SESSION_STORES[kind]()
+        return _store
+
+
+def serve(address=None, authkey=None):
+    """Run the shared store until interrupted"""
+    manager = _StoreManager(address=_address(address), authkey=_authkey(authkey))
+    server = manager.get_server()
+    host, port = server.address
+    print(f"🗄️ Session store listening on {host}:{port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared trainer session store (SESSION_STORE=manager)")
+    parser.add_argument("--address", help="host:port, default SESSION_STORE_ADDRESS")
+    args = parser.parse_args()
+    if not settings.SESSION_STORE_AUTHKEY:
+        raise SystemExit("Set SESSION_STORE_AUTHKEY (a long random secret shared with the app workers)")
+    serve(args.address)
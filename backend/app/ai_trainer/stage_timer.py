@@ -0,0 +1,47 @@
+import time
+
+
+class StageTimer:
+    """Time spent in each stage of the frame pipeline.
+
+    start() before the first stage, then lap(name) after each one records the
+    time since the previous mark. current holds the laps of the frame in
+    progress; with keep, samples (seconds) also pile up per stage until
+    reset(), for benchmarks.
+    """
+
+    def __init__(self, keep=True):
+        self.keep = keep
+        self.samples = {}
+        self.current = {}
+        self._mark = None
+
+    def start(self):
+        self.current = {}
+        self._mark = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        seconds = now - self._mark
+        self.current[stage] = seconds
+        if self.keep:
+            self.samples.setdefault(stage, []).append(seconds)
+        self._mark = now
+
+    def reset(self):
+        self.samples = {}
+
+
+class NullTimer:
+    """StageTimer that records nothing (METRICS_ENABLED off)"""
+
+    current = {}
+
+    def start(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+
+NULL_TIMER = NullTimer()
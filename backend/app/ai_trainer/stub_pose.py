@@ -0,0 +1,65 @@
+import math
+from collections import namedtuple
+
+from mediapipe.framework.formats import landmark_pb2
+
+from app.ai_trainer.landmarks import LANDMARK_INDEX, NUM_LANDMARKS
+
+StubResults = namedtuple("StubResults", ["pose_landmarks"])
+
+# Frames per simulated rep
+STUB_PERIOD = 30
+
+# (x, y) of a standing figure facing the camera, and where each point moves at
+# the bottom of a rep: knees and elbows bend, hips drop, heels and wrists rise
+_STAND = {
+    "nose": (0.50, 0.16), "leftShoulder": (0.42, 0.30), "rightShoulder": (0.58, 0.30),
+    "leftElbow": (0.40, 0.42), "rightElbow": (0.60, 0.42),
+    "leftWrist": (0.40, 0.54), "rightWrist": (0.60, 0.54),
+    "leftHip": (0.45, 0.55), "rightHip": (0.55, 0.55),
+    "leftKnee": (0.45, 0.72), "rightKnee": (0.55, 0.72),
+    "leftAnkle": (0.45, 0.90), "rightAnkle": (0.55, 0.90),
+    "leftHeel": (0.44, 0.92), "rightHeel": (0.56, 0.92),
+    "leftFootIndex": (0.47, 0.94), "rightFootIndex": (0.53, 0.94),
+}
+_BENT = {
+    "leftWrist": (0.46, 0.32), "rightWrist": (0.54, 0.32),
+    "leftHip": (0.45, 0.66), "rightHip": (0.55, 0.66),
+    "leftKnee": (0.36, 0.74), "rightKnee": (0.64, 0.74),
+    "leftAnkle": (0.45, 0.86), "rightAnkle": (0.55, 0.86),
+    "leftHeel": (0.44, 0.88), "rightHeel": (0.56, 0.88),
+}
+
+
+def stub_points(index):
+    """(x, y) of all 33 landmarks for the index-th stub frame"""
+    phase = (1 - math.cos(2 * math.pi * index / STUB_PERIOD)) / 2
+    points = [_STAND["nose"]] * NUM_LANDMARKS
+    for name, (x, y) in _STAND.items():
+        bx, by = _BENT.get(name, (x, y))
+        points[LANDMARK_INDEX[name]] = (x + (bx - x) * phase, y + (by - y) * phase)
+    return points
+
+
+class StubPose:
+    """Deterministic stand-in for mp.solutions.pose.Pose (POSE_BACKEND=stub).
+
+    Ignores the image and plays a figure doing one squat / curl every
+    STUB_PERIOD calls, so the whole pipeline can be timed without the model.
+    """
+
+    def __init__(self, **options):
+        self.calls = 0
+
+    def process(self, image):
+        landmarks = landmark_pb2.NormalizedLandmarkList()
+        for x, y in stub_points(self.calls):
+            landmarks.landmark.add(x=x, y=y, z=0.0, visibility=0.99)
+        self.calls += 1
+        return StubResults(landmarks)
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,222 @@
+import collections
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from app.ai_trainer.landmarks import NUM_LANDMARKS, landmark_array, mirror_points
+from app.ai_trainer.pose_input import PoseInput
+from app.ai_trainer.pose_pool import pose_pool_for
+from app.ai_trainer.rep_engine import MetricPlan, RepCounter
+from app.config import settings
+
+# Frame rates outside this range are container junk (e.g. 1000 for some WebM files)
+MAX_PLAUSIBLE_FPS = 240
+
+
+def video_info(path):
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            raise ValueError("Could not open video")
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        capture.release()
+    if not 0 < fps <= MAX_PLAUSIBLE_FPS:
+        fps = None
+    return fps, frames if frames > 0 else None
+
+
+def open_video(path, start=0):
+    """Capture positioned at frame start, frame-exact even where the codec's seek isn't.
+
+    CAP_PROP_POS_FRAMES seeks land on a nearby keyframe with some codecs and
+    containers; when the position read back differs, the video is decoded
+    from the beginning and frames are grabbed up to start instead.
+    """
+    capture = cv2.VideoCapture(path)
+    if not start:
+        return capture
+    if capture.set(cv2.CAP_PROP_POS_FRAMES, start) and int(capture.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+        return capture
+    capture.release()
+    capture = cv2.VideoCapture(path)
+    for _ in range(start):
+        if not capture.grab():
+            break
+    return capture
+
+
+def iter_frames(capture, start, stop, step):
+    """Yield (index, seconds, frame) for every step-th frame of [start, stop).
+
+    Skipped frames are only grabbed, never converted, and nothing is kept
+    between iterations, so memory doesn't depend on the video's length.
+    """
+    index = start
+    while stop is None or index < stop:
+        if not capture.grab():
+            return
+        if (index - start) % step == 0:
+            ok, frame = capture.retrieve()
+            if not ok:
+                return
+            yield index, capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, frame
+        index += 1
+
+
+def analyze_frames(path, start, stop, step, plan, model_complexity=None, mirror=True, batch=None):
+    """Landmarks for frames [start, stop) of the video, and every metric of the plan per batch.
+
+    Yields (frame indices, timestamps, detected mask, metric table) for each
+    batch of up to VIDEO_CHUNK_FRAMES sampled frames; only one batch of
+    landmarks is held at a time.
+    """
+    batch = batch or settings.VIDEO_CHUNK_FRAMES
+    capture = open_video(path, start)
+    pool = pose_pool_for(model_complexity)
+    pose = pool.acquire()
+    pose_input = PoseInput()
+    points = np.full((batch, NUM_LANDMARKS, 4), np.nan)
+    indices, timestamps = [], []
+    try:
+        for index, seconds, frame in iter_frames(capture, start, stop, step):
+            results = pose.process(pose_input.prepare(frame))
+            landmarks = results.pose_landmarks.landmark if results.pose_landmarks else None
+            if landmarks:
+                pose_input.map_landmarks(landmarks)
+                points[len(indices)] = landmark_array(landmarks)
+            if pose_input.update(landmarks):
+                pose.reset()
+            indices.append(index)
+            timestamps.append(seconds)
+            if len(indices) == batch:
+                yield _measure(indices, timestamps, points, plan, mirror)
+                points.fill(np.nan)
+                indices, timestamps = [], []
+        if indices:
+            yield _measure(indices, timestamps, points[:len(indices)], plan, mirror)
+    finally:
+        pool.release(pose)
+        capture.release()
+
+
+def _measure(indices, timestamps, points, plan, mirror):
+    detected = ~np.isnan(points[:, 0, 0])
+    if mirror:
+        # Same orientation as the live socket, which flips frames before inference
+        points = mirror_points(points)
+    return indices, timestamps, detected.tolist(), plan.compute(points)
+
+
+def analyze_chunk(path, start, stop, step, plan, model_complexity=None, mirror=True):
+    """All batches of one work unit (see analyze_frames)"""
+    return list(analyze_frames(path, start, stop, step, plan, model_complexity, mirror))
+
+
+def _batches(path, spec, frames, step, mirror, workers):
+    """Metric batches in video order, at most 2 * workers work units in flight."""
+    plan = MetricPlan(spec.metrics)
+    if frames is None or workers == 1:
+        # Unknown length (streamed WebM and the like) or no parallelism: one sequential pass
+        yield from analyze_frames(path, 0, frames, step, plan, spec.model_complexity, mirror)
+        return
+
+    # Unit boundaries on multiples of step keep the sampling grid continuous
+    size = max(step, settings.VIDEO_CHUNK_FRAMES * step)
+    bounds = [(start, min(start + size, frames)) for start in range(0, frames, size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for start, stop in bounds:
+            pending.append(executor.submit(
+                analyze_chunk, path, start, stop, step, plan, spec.model_complexity, mirror))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def analyze_video(path, spec, sample_fps=None, mirror=True, workers=None):
+    """Rep-by-rep timeline of a recorded workout.
+
+    Chunks of the video are decoded and run through Pose in parallel; the
+    counter then walks their metric tables in order, so results match a live
+    session at the sampled frame rate.
+    """
+    started = time.monotonic()
+    sample_fps = settings.VIDEO_SAMPLE_FPS if sample_fps is None else sample_fps
+    # Every work unit holds a Pose graph for its whole run
+    workers = max(1, min(workers or settings.VIDEO_WORKERS, settings.POSE_POOL_SIZE))
+    fps, frames = video_info(path)
+    step = max(1, round(fps / sample_fps)) if fps and sample_fps else 1
+
+    counter = RepCounter(spec)
+    hold = spec.mode == "hold"
+    timeline = []
+    total, sets, analysed, detected_frames = 0, 1, 0, 0
+    previous = 0
+    hold_start = None
+    last_time = 0.0
+
+    for indices, timestamps, detected, table in _batches(path, spec, frames, step, mirror, workers):
+        for index, seconds, seen, row in zip(indices, timestamps, detected, table.tolist()):
+            values = dict(zip(counter.plan.names, row)) if seen else None
+            result = counter.step(values, seconds)
+            analysed += 1
+            detected_frames += seen
+            last_time = seconds
+
+            if hold:
+                if counter.in_position and hold_start is None:
+                    hold_start = seconds
+                elif not counter.in_position and hold_start is not None:
+                    timeline.append(_hold_entry(len(timeline) + 1, hold_start, seconds, index))
+                    hold_start = None
+                continue
+
+            count = result["count"]
+            if count < previous:
+                # Counter reset after a full set (and may have counted the next rep already)
+                sets += 1
+                previous = 0
+            if count > previous:
+                total += 1
+                timeline.append({
+                    "rep": total,
+                    "set": sets,
+                    "frame": index,
+                    "time": round(seconds, 3),
+                    counter.metric_name: None if result[counter.metric_name] is None
+                    else round(result[counter.metric_name], 3),
+                })
+            previous = count
+
+    if hold and hold_start is not None:
+        timeline.append(_hold_entry(len(timeline) + 1, hold_start, last_time, None))
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "exercise": spec.name,
+        "fps": fps,
+        "frames_analysed": analysed,
+        "frames_with_pose": detected_frames,
+        "duration": round(last_time, 3),
+        "processing_time": round(elapsed, 3),
+        # Seconds of video per second of processing
+        "speed": round(last_time / elapsed, 2) if elapsed else None,
+        "timeline": timeline,
+    }
+    if hold:
+        summary["holds"] = len(timeline)
+        summary["longest_hold"] = max((entry["duration"] for entry in timeline), default=0)
+    else:
+        summary["reps"] = total
+        summary["sets"] = sets if total else 0
+    return summary
+
+
+def _hold_entry(number, start, end, frame):
+    return {"hold": number, "start": round(start, 3), "end": round(end, 3),
+            "duration": round(end - start, 3), "frame": frame}
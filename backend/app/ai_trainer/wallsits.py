@@ -1,87 +0,0 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-import math
-import base64
-
-mp_drawing = mp.solutions.drawing_utils
-mp_pose = mp.solutions.pose
-
-# Initialize Mediapipe Pose
-pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-
-# Global state for counting
-state = {"count": 0, "direction": 0}
-
-def calculate_angle(a, b, c):
-    """Calculate the angle between three points."""
-    a = np.array(a)
-    b = np.array(b)
-    c = np.array(c)
-    radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
-    angle = abs(radians * 180.0 / np.pi)
-    if angle > 180.0:
-        angle = 360 - angle
-    return angle
-
-
-def process_frame(image_bytes):
-    """Process incoming frame for pose estimation and rep counting."""
-    np_arr = np.frombuffer(image_bytes, np.uint8)
-    frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-    frame = cv2.flip(frame, 1)
-
-    # Convert image to RGB
-    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(image_rgb)
-
-    feedback = "Align properly within frame"
-    count = state["count"]
-
-    if results.pose_landmarks:
-        mp_drawing.draw_landmarks(
-            frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-            mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2)
-        )
-
-        landmarks = results.pose_landmarks.landmark
-
-        # Get coordinates for one arm
-        shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x,
-                    landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-        elbow = [landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].x,
-                 landmarks[mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-        wrist = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x,
-                 landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y]
-
-        angle = calculate_angle(shoulder, elbow, wrist)
-
-        # Rep counting logic
-        if angle <= 90:
-            feedback = "Push up!"
-            if state["direction"] == 0:
-                state["count"] += 1
-                state["direction"] = 1
-        elif angle >= 160:
-            feedback = "Go down slowly"
-            if state["direction"] == 1:
-                state["direction"] = 0
-
-        count = state["count"]
-
-        # Display text
-        cv2.putText(frame, f"Reps: {count}", (20, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, feedback, (20, 90),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-
-    # Encode annotated frame to base64
-    _, buffer = cv2.imencode('.jpg', frame)
-    jpg_as_text = base64.b64encode(buffer).decode('utf-8')
-
-    return {
-        "frame": jpg_as_text,
-        "count": count,
-        "feedback": feedback
-    }
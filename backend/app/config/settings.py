@@ -0,0 +1,106 @@
+import os
+
+from decouple import Csv, config
+
+# ----------------------------
+# AI TRAINER SETTINGS
+# ----------------------------
+
+# Worker pool that runs decode -> pose -> draw -> encode off the event loop.
+# "thread" shares one pool; "process" pins each session to a single-process lane.
+TRAINER_EXECUTOR = config("TRAINER_EXECUTOR", default="thread")
+TRAINER_WORKERS = config("TRAINER_WORKERS", default=os.cpu_count() or 1, cast=int)
+
+# Max frames queued or running in the pool at once (across all sessions)
+TRAINER_MAX_PENDING = config("TRAINER_MAX_PENDING", default=TRAINER_WORKERS * 2, cast=int)
+
+# Shared MediaPipe Pose graphs, created on demand up to this many per process. A camera
+# session holds one for its whole lifetime, so this caps concurrent camera sessions per
+# process and costs memory (each graph keeps its model and tracking state), not CPU:
+# TRAINER_WORKERS decides how many frames run at once. Size it for sessions, not cores.
+POSE_POOL_SIZE = config("POSE_POOL_SIZE", default=8 * (os.cpu_count() or 1), cast=int)
+# Seconds a new session keeps asking for a free Pose graph before it gets an error; the
+# socket handler waits on the event loop, never on a trainer worker
+POSE_POOL_TIMEOUT = config("POSE_POOL_TIMEOUT", default=10.0, cast=float)
+# "mediapipe", or "stub" for a deterministic fake skeleton that skips the model
+# (benchmarks and load tests of everything around inference)
+POSE_BACKEND = config("POSE_BACKEND", default="mediapipe")
+
+# Exercises imported (and a Pose graph built) at startup, e.g. "squats,lunges,plank".
+# Everything else is loaded on first connect.
+TRAINER_PREWARM = config("TRAINER_PREWARM", default="", cast=Csv())
+
+# MediaPipe Pose model (0 lite, 1 full, 2 heavy) for exercises that don't set their own
+POSE_MODEL_COMPLEXITY = config("POSE_MODEL_COMPLEXITY", default=1, cast=int)
+# Longest side in pixels of the image given to pose.process (the model works at 256x256);
+# bigger frames are downscaled first. 0 keeps the sent resolution.
+POSE_INPUT_SIZE = config("POSE_INPUT_SIZE", default=256, cast=int)
+# Crop each frame to the area around the previous frame's landmarks before inference,
+# padded by this fraction of the body's size
+POSE_ROI = config("POSE_ROI", default=True, cast=bool)
+POSE_ROI_MARGIN = config("POSE_ROI_MARGIN", default=0.25, cast=float)
+# Landmarks-only sessions (echo off) decode JPEGs at 1/2, 1/4 or 1/8 size when the crop
+# given to the model still has POSE_INPUT_SIZE pixels on its longest side
+FRAME_REDUCED_DECODE = config("FRAME_REDUCED_DECODE", default=True, cast=bool)
+
+# Annotated frames sent back (defaults for the quality / scale / frame_every session options):
+# JPEG quality (OpenCV's default is 95), downscale factor, and every how many results carry the
+# picture; counts and feedback go out with every result
+FRAME_JPEG_QUALITY = config("FRAME_JPEG_QUALITY", default=95, cast=int)
+FRAME_OUTPUT_SCALE = config("FRAME_OUTPUT_SCALE", default=1.0, cast=float)
+FRAME_OUTPUT_EVERY = config("FRAME_OUTPUT_EVERY", default=1, cast=int)
+
+# Adaptive frame rate: each session measures receive -> result latency and tells the
+# client which fps and frame width to send ({"control": {"fps", "max_width"}})
+TRAINER_TARGET_LATENCY_MS = config("TRAINER_TARGET_LATENCY_MS", default=150.0, cast=float)
+TRAINER_MIN_FPS = config("TRAINER_MIN_FPS", default=2.0, cast=float)
+TRAINER_MAX_FPS = config("TRAINER_MAX_FPS", default=15.0, cast=float)
+TRAINER_START_FPS = config("TRAINER_START_FPS", default=5.0, cast=float)
+TRAINER_FRAME_WIDTHS = config("TRAINER_FRAME_WIDTHS", default="320,480,640", cast=Csv(int))
+# Seconds between control decisions
+TRAINER_CONTROL_INTERVAL = config("TRAINER_CONTROL_INTERVAL", default=1.0, cast=float)
+
+# Keyframe inference: run pose.process at most every N-th frame and estimate landmarks in
+# between ("flow": optical flow, "extrapolate": last keyframes' velocity). 1 turns it off;
+# sessions can pick their own N with the "keyframes" option.
+TRAINER_KEYFRAME_INTERVAL = config("TRAINER_KEYFRAME_INTERVAL", default=1, cast=int)
+TRAINER_KEYFRAME_METHOD = config("TRAINER_KEYFRAME_METHOD", default="flow")
+# Mean landmark travel (normalized frame units) allowed between keyframes; the interval
+# shrinks as motion gets faster
+TRAINER_KEYFRAME_MOTION = config("TRAINER_KEYFRAME_MOTION", default=0.02, cast=float)
+
+# Hold exercises (plank, wall sits): posture checks per second while the hold is steady,
+# and while getting into position or drifting (a metric within TRAINER_HOLD_DRIFT of its
+# threshold, as a fraction of it). Clients are asked to send frames at the same rate.
+TRAINER_HOLD_CHECK_FPS = config("TRAINER_HOLD_CHECK_FPS", default=1.0, cast=float)
+TRAINER_HOLD_ACTIVE_FPS = config("TRAINER_HOLD_ACTIVE_FPS", default=5.0, cast=float)
+TRAINER_HOLD_DRIFT = config("TRAINER_HOLD_DRIFT", default=0.05, cast=float)
+
+# Session state for ?session=<id> reconnects: "memory" (this worker only) or "manager"
+# (a shared store at SESSION_STORE_ADDRESS, run with `python -m app.ai_trainer.session_store`)
+SESSION_STORE = config("SESSION_STORE", default="memory")
+SESSION_STORE_ADDRESS = config("SESSION_STORE_ADDRESS", default="127.0.0.1:50055")
+# Shared secret of the manager store, required with SESSION_STORE=manager: the manager
+# unpickles every request, so whoever knows the key can run code in the store and its clients
+SESSION_STORE_AUTHKEY = config("SESSION_STORE_AUTHKEY", default="")
+# Seconds a saved session survives without updates
+SESSION_STORE_TTL = config("SESSION_STORE_TTL", default=3600.0, cast=float)
+
+# Prometheus metrics at /metrics (per-stage timings cost a few perf_counter calls per frame)
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+
+# Session recordings (landmarks, metric and count per frame, see ai_trainer/recording.py) are
+# written here for sessions that connect with ?record=1, or for all of them with
+# TRAINER_RECORD_ALL; empty turns recording off
+TRAINER_RECORD_DIR = config("TRAINER_RECORD_DIR", default="")
+TRAINER_RECORD_ALL = config("TRAINER_RECORD_ALL", default=False, cast=bool)
+
+# Offline video analysis (POST /ai_trainer/{exercise}/analyze)
+# Frames per second actually analysed; 0 analyses every frame
+VIDEO_SAMPLE_FPS = config("VIDEO_SAMPLE_FPS", default=15.0, cast=float)
+# Video frames per work unit; each unit is decoded and run through its own Pose graph
+VIDEO_CHUNK_FRAMES = config("VIDEO_CHUNK_FRAMES", default=300, cast=int)
+# Work units decoded / analysed in parallel (shares POSE_POOL_SIZE with live sessions)
+VIDEO_WORKERS = config("VIDEO_WORKERS", default=max(1, (os.cpu_count() or 1) // 2), cast=int)
+# Largest accepted upload
+VIDEO_MAX_BYTES = config("VIDEO_MAX_BYTES", default=500 * 1024 * 1024, cast=int)
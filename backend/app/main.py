@@ -1,21 +1,34 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from app.ai_trainer import (
-    squats, lunges, stepup, wallsits, calfraise, plank, pushups,
-    crunches, bicepcurls, tricepdips, jumpingjacks, mountainclimbers,
-    jumprope, highknee, buttkicks
+from app.ai_trainer.executor import get_executor, shutdown_executor
+from app.ai_trainer.frame_slot import LatestFrameSlot
+from app.ai_trainer.pose_pool import pool_stats
+from app.ai_trainer.rate_control import RateController
+from app.ai_trainer.registry import get_trainer_class, normalize_name, prewarm
+from app.ai_trainer.session_store import get_session_store
+from app.config import settings
+from app.utils.frame_protocol import (
+    BINARY_SUBPROTOCOL, MSGPACK_SUBPROTOCOL, negotiate_subprotocol, pack_message, pack_result, to_json_result,
+    unpack_message,
 )
-from app.utils.pose_estimation import PoseEstimator
-from app.utils.feedback_generator import FeedbackGenerator
-from app.routes import auth_routes, user_routes, workout_routes, progress_routes
+from app.utils import metrics
+from app.routes import analysis_routes, auth_routes, user_routes, workout_routes, progress_routes
 
 
 
 
+import asyncio
 import json
-import importlib
+import time
 import traceback
 
+# Text (or MessagePack) messages up to this size are parsed by the reader (options, landmarks);
+# bigger ones are frames and are only parsed if they survive frame dropping
+CONTROL_MESSAGE_MAX_SIZE = 16 * 1024
+
+# Seconds between checkout attempts while every Pose graph is taken
+POSE_RETRY_INTERVAL = 0.1
+
 origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -35,118 +48,299 @@ app.add_middleware(
 app.include_router(user_routes.router)
 app.include_router(auth_routes.router)
 app.include_router(workout_routes.router)
-# Register any routers that exist in the modules (if modules have routers)
-modules = [
-    squats, lunges, stepup, wallsits, calfraise, plank, pushups,
-    crunches, bicepcurls, tricepdips, jumpingjacks, mountainclimbers,
-    jumprope, highknee, buttkicks
-]
+app.include_router(progress_routes.router)
+app.include_router(analysis_routes.router)
 
-for m in modules:
-    # include router if module defines one
-    if hasattr(m, "router"):
-        try:
-            app.include_router(m.router)
-        except Exception:
-            print(f"Could not include router for module {m}: {traceback.format_exc()}")
+@app.on_event("startup")
+async def startup():
+    if settings.SESSION_STORE == "manager" and not settings.SESSION_STORE_AUTHKEY:
+        # The manager unpickles requests: never run it with a guessable key
+        raise RuntimeError("SESSION_STORE=manager needs SESSION_STORE_AUTHKEY")
+    # Trainer modules load lazily; only the configured subset is imported up front
+    if settings.TRAINER_PREWARM:
+        await asyncio.get_running_loop().run_in_executor(None, prewarm, settings.TRAINER_PREWARM)
 
-# Init utilities
-pose_estimator = PoseEstimator()
-feedback_generator = FeedbackGenerator()
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_executor()
 
 @app.get("/")
 async def root():
     return {"message": "FitFlow Hub Backend Running ✅"}
 
+@app.get("/ai_trainer/pose_pool")
+async def pose_pool_stats():
+    # Occupancy and checkout wait times of this process's Pose graphs
+    return {"pools": pool_stats()}
+
+if settings.METRICS_ENABLED:
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        started = time.monotonic()
+        response = await call_next(request)
+        # Route template (/progress/{user_id}), not the raw path, to keep the series bounded
+        route = request.scope.get("route")
+        if route is not None and route.path != "/metrics":
+            metrics.HTTP_REQUEST_SECONDS.labels(request.method, route.path, response.status_code).observe(
+                time.monotonic() - started)
+        return response
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        for pool in pool_stats():
+            complexity = pool["options"].get("model_complexity", "")
+            metrics.POSE_POOL_IN_USE.labels(complexity).set(pool["in_use"])
+            metrics.POSE_POOL_CREATED.labels(complexity).set(pool["created"])
+            metrics.POSE_POOL_WAITING.labels(complexity).set(pool["waiting"])
+            metrics.POSE_POOL_TIMEOUTS.labels(complexity).set(pool["timeouts"])
+            metrics.POSE_POOL_BUSY.labels(complexity).set(pool["busy"])
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # Unified websocket handler
 @app.websocket("/ws/ai_trainer/{exercise_name}")
 async def websocket_endpoint(websocket: WebSocket, exercise_name: str):
-    await websocket.accept()
-    try:
-        # Normalize name (remove spaces, lower)
-        normalized_name = exercise_name.replace(" ", "").lower()
-
-        # Try to get module from imported globals or import dynamically
-        trainer_module = globals().get(normalized_name)
-        if trainer_module is None:
-            try:
-                trainer_module = importlib.import_module(f"app.ai_trainer.{normalized_name}")
-            except Exception:
-                await websocket.send_text(json.dumps({"error": f"Unknown exercise: {exercise_name}"}))
-                return
-
-        
-        # Determine what API the module exposes:
-        # Prefer process_pose(landmarks) if present, else process_frame(frame_b64)
-        if hasattr(trainer_module, "process_pose"):
-            mode = "pose"
-        elif hasattr(trainer_module, "process_frame"):
-            mode = "frame"
+    # Clients offering the binary subprotocol send raw JPEG bytes and get packed results back;
+    # with the MessagePack one every message both ways is a MessagePack map
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols"))
+    binary = subprotocol == BINARY_SUBPROTOCOL
+    packed = subprotocol == MSGPACK_SUBPROTOCOL
+    await websocket.accept(subprotocol=subprotocol)
+
+    async def send_message(message):
+        if packed:
+            await websocket.send_bytes(pack_message(message))
         else:
-            await websocket.send_text(json.dumps({"error": f"Trainer module for {exercise_name} missing process_pose/process_frame"}))
+            await websocket.send_text(json.dumps(message))
+
+    try:
+        # Every connection gets its own trainer instance (counter state + Pose tracker);
+        # the registry imports the exercise module on first use
+        try:
+            trainer_class = get_trainer_class(exercise_name)
+        except Exception:
+            print(f"Could not load trainer for {exercise_name}:", traceback.format_exc())
+            trainer_class = None
+        if trainer_class is None:
+            await send_message({"error": f"Unknown exercise: {exercise_name}"})
             return
 
-        await websocket.send_text(json.dumps({"status": f"✅ Connected to {exercise_name} trainer"}))
-
-        # Loop: receive JSON frames like { "frame": "data:image/jpeg;base64,..." }
-        while True:
-            try:
-                data_text = await websocket.receive_text()
-            except WebSocketDisconnect:
-                print(f"❌ Disconnected: {exercise_name}")
-                break
-            except Exception:
-                # connection closed or not text
-                print(f"Receive error for {exercise_name}", traceback.format_exc())
-                break
-
-            if not data_text:
-                continue
-
-            # try parse JSON
-            try:
-                payload = json.loads(data_text)
-            except Exception:
-                # If not JSON, try interpret as direct data url string
-                payload = {"frame": data_text}
-
-            frame_b64 = None
-            landmarks = None
-
-            if isinstance(payload, dict) and payload.get("frame"):
-                frame_b64 = payload.get("frame")
-                # If the trainer expects landmarks (process_pose), use pose_estimator to extract them
-                if mode == "pose":
+        await send_message({"status": f"✅ Connected to {exercise_name} trainer"})
+
+        # Tells the client what fps / frame width this session can keep up with
+        rate = RateController()
+        await send_message(rate.update())
+
+        # Session options come from the query string (e.g. ?echo=0) and can be
+        # changed later with an {"options": {...}} message
+        options = dict(websocket.query_params)
+        pending_options = {}
+
+        # Frames of this session run in order on the shared trainer pool
+        lane = get_executor().session(trainer_class, options)
+        exercise = normalize_name(exercise_name)
+        receiver = None
+        # Everything after the lane opens is inside the try, so its trainer and Pose graph
+        # are released however the session ends, setup included
+        try:
+            # ?session=<id>: counts are saved to the session store as they change, and a
+            # reconnect with the same id (on any worker sharing the store) resumes them
+            store = None
+            store_key = f"{exercise}:{options['session']}" if options.get("session") else None
+            saved_state = None
+            if store_key:
+                try:
+                    store = get_session_store()
+                    saved_state = await asyncio.to_thread(store.get, store_key)
+                    if saved_state:
+                        await lane.call("restore", saved_state)
+                        print(f"♻️ Resumed {store_key}")
+                except Exception:
+                    print(f"Session store unavailable for {store_key}:", traceback.format_exc())
+                    store = None
+
+            # Reader only stores the newest message; the trainer picks it up when free
+            slot = LatestFrameSlot()
+
+            async def receive_frames():
+                # Receive JSON frames like { "frame": "data:image/jpeg;base64,..." },
+                # landmarks like { "landmarks": [...] } or, in binary mode, raw JPEG bytes
+                try:
+                    while True:
+                        message = await websocket.receive()
+                        if message["type"] == "websocket.disconnect":
+                            print(f"❌ Disconnected: {exercise_name}")
+                            break
+                        text = message.get("text")
+                        small = message.get("bytes") if packed else text
+                        if small and len(small) <= CONTROL_MESSAGE_MAX_SIZE:
+                            # Small messages are parsed on arrival so option changes are never dropped
+                            try:
+                                message["payload"] = unpack_message(small) if packed else json.loads(small)
+                            except Exception:
+                                pass
+                            payload = message.get("payload")
+                            if isinstance(payload, dict) and isinstance(payload.get("options"), dict):
+                                pending_options.update(payload["options"])
+                                continue
+                        if message.get("bytes") or text:
+                            message["received"] = time.monotonic()
+                            slot.put(message)
+                except Exception:
+                    # connection closed
+                    print(f"Receive error for {exercise_name}", traceback.format_exc())
+                    metrics.WEBSOCKET_ERRORS.labels("receive").inc()
+                finally:
+                    slot.close()
+
+            metrics.TRAINER_SESSIONS.labels(exercise).inc()
+            metrics.TRAINER_ACTIVE_SESSIONS.labels(exercise).inc()
+            receiver = asyncio.create_task(receive_frames())
+            # Since when this session has been asking for a free Pose graph
+            pose_wait_started = None
+            # Messages taken off the slot without a result of their own; the next result
+            # reports them as dropped, so clients can pair results with what they sent
+            unanswered = 0
+            while True:
+                item = await slot.get()
+                if item is None:
+                    break
+                message, dropped = item
+
+                if pending_options:
+                    changed = dict(pending_options)
+                    pending_options.clear()
                     try:
-                        # PoseEstimator should expose a method that takes base64 image (data URL) and returns landmarks dict.
-                        landmarks = pose_estimator.estimate_from_data_url(frame_b64)
-                    except Exception:
-                        # try to fallback to no landmarks
-                        landmarks = {}
-                else:
-                    # mode == "frame" -> we can call process_frame directly with frame_b64
-                    landmarks = None
-            elif isinstance(payload, dict) and payload.get("landmarks"):
-                landmarks = payload.get("landmarks")
-
-            try:
-                if mode == "pose":
-                    # call module.process_pose(landmarks)
-                    feedback = trainer_module.process_pose(landmarks or {})
+                        await lane.call("set_options", changed)
+                    except Exception as e:
+                        # Bad option values (e.g. a station not in the circuit) don't end the session
+                        await send_message({"error": str(e)})
+
+                frame_data = None
+                landmarks = None
+                has_landmarks = False
+
+                if message.get("bytes") and not packed:
+                    # Binary message is the raw JPEG itself, no base64/JSON wrapping
+                    frame_data = message["bytes"]
                 else:
-                    # call module.process_frame(frame_b64) -- trainer returns dict or JSON-serializable
-                    feedback = trainer_module.process_frame(frame_b64)
-            except Exception as e:
-                print("Error processing frame/pose:", traceback.format_exc())
-                feedback = {"error": str(e)}
-
-            # Send back JSON result
-            try:
-                await websocket.send_text(json.dumps(feedback))
-            except Exception:
-                # If send fails, break the loop
-                print("Failed to send feedback or connection closed.")
-                break
+                    # Large frames are parsed only now, so dropped frames never pay for json.loads
+                    data_text = message.get("text")
+                    payload = message.get("payload")
+                    if payload is None and message.get("bytes"):
+                        try:
+                            payload = unpack_message(message["bytes"])
+                        except Exception:
+                            # Not MessagePack: take it as a raw JPEG, like the binary subprotocol
+                            payload = {"frame": message["bytes"]}
+                    elif payload is None:
+                        try:
+                            payload = json.loads(data_text)
+                        except Exception:
+                            # If not JSON, try interpret as direct data url string
+                            payload = {"frame": data_text}
+
+                    if isinstance(payload, dict) and payload.get("frame"):
+                        frame_data = payload.get("frame")
+                    elif isinstance(payload, dict) and "landmarks" in payload:
+                        # Landmarks from client-side pose detection (33-point array or name -> point dict)
+                        landmarks = payload.get("landmarks")
+                        has_landmarks = True
+
+                started = time.monotonic()
+                try:
+                    if has_landmarks:
+                        # Client ran pose detection itself: only the counter runs here
+                        feedback = await lane.call("process_pose", landmarks)
+                    elif frame_data is not None:
+                        # call trainer.process_frame(frame_data) off the event loop -- trainer returns dict with JPEG bytes
+                        feedback = await lane.call("process_frame", frame_data)
+                    else:
+                        unanswered += dropped + 1
+                        continue
+                except Exception as e:
+                    print("Error processing frame/pose:", traceback.format_exc())
+                    feedback = {"error": str(e)}
+                processing = time.monotonic() - started
+
+                if isinstance(feedback, dict) and feedback.pop("pose_busy", False):
+                    # Every Pose graph is taken: wait here on the loop, not on a trainer worker,
+                    # and try again with the newest frame; the error goes out after POSE_POOL_TIMEOUT
+                    if pose_wait_started is None:
+                        pose_wait_started = started
+                    if started - pose_wait_started < settings.POSE_POOL_TIMEOUT:
+                        unanswered += dropped + 1
+                        await asyncio.sleep(POSE_RETRY_INTERVAL)
+                        continue
+                pose_wait_started = None
+                dropped += unanswered
+                unanswered = 0
+
+                check_fps = None
+                stages = None
+                if isinstance(feedback, dict):
+                    # Frames discarded or left unanswered since the previous result
+                    feedback["dropped"] = dropped
+                    # Hold exercises ask for fewer frames while the posture is steady
+                    check_fps = feedback.pop("check_fps", None)
+                    stages = feedback.pop("stages", None)
+                    state = feedback.pop("state", None)
+                    if store is not None and state is not None and state != saved_state:
+                        try:
+                            await asyncio.to_thread(store.put, store_key, state)
+                            saved_state = state
+                        except Exception:
+                            print(f"Could not save session {store_key}:", traceback.format_exc())
+                    if "error" in feedback:
+                        metrics.TRAINER_FRAME_ERRORS.labels(exercise).inc()
+
+                metrics.TRAINER_FRAMES.labels(exercise).inc()
+                if dropped:
+                    metrics.TRAINER_FRAMES_DROPPED.labels(exercise).inc(dropped)
+                metrics.TRAINER_FRAME_SECONDS.labels(exercise).observe(processing)
+
+                # Send back packed binary result, or JSON with the frame base64-encoded
+                # (landmarks-only results stay JSON in both modes; results sent without their
+                # image under frame_every carry frame=None and are packed too)
+                try:
+                    encode_started = time.monotonic()
+                    if packed:
+                        reply = pack_message(feedback)
+                        stage = "msgpack"
+                    elif binary and isinstance(feedback, dict) and "frame" in feedback:
+                        reply = pack_result(feedback)
+                        stage = "pack"
+                    else:
+                        reply = json.dumps(to_json_result(feedback))
+                        stage = "b64encode"
+                    if stages is not None:
+                        stages[stage] = time.monotonic() - encode_started
+                        for name, seconds in stages.items():
+                            metrics.TRAINER_STAGE_SECONDS.labels(name, exercise).observe(seconds)
+                    if isinstance(reply, bytes):
+                        await websocket.send_bytes(reply)
+                    else:
+                        await websocket.send_text(reply)
+
+                    latency = time.monotonic() - message["received"]
+                    metrics.TRAINER_FRAME_LATENCY.labels(exercise).observe(latency)
+                    rate.record(latency, processing, dropped)
+                    if check_fps is not None:
+                        rate.limit(check_fps)
+                    control = rate.update()
+                    if control:
+                        await send_message(control)
+                except Exception:
+                    # If send fails, break the loop
+                    print("Failed to send feedback or connection closed.")
+                    metrics.WEBSOCKET_ERRORS.labels("send").inc()
+                    break
+        finally:
+            if receiver is not None:
+                metrics.TRAINER_ACTIVE_SESSIONS.labels(exercise).dec()
+                receiver.cancel()
+            # Release this session's trainer and its Pose graph; shielded so a cancelled
+            # handler (client gone, server stopping) can't abandon the release half way
+            await asyncio.shield(lane.close())
 
     except Exception:
         print("Unexpected error in websocket handler:", traceback.format_exc())
@@ -0,0 +1,80 @@
+import os
+import tempfile
+
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from app.ai_trainer.pose_pool import PoolTimeout
+from app.ai_trainer.registry import EXERCISES, normalize_name
+from app.ai_trainer.video_analysis import analyze_video
+from app.config import settings
+
+# Upload is copied to disk in pieces this big, never held in memory whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _too_large():
+    return HTTPException(status_code=413, detail="Video too large")
+
+
+class UploadLimitRoute(APIRoute):
+    """Route that rejects request bodies over VIDEO_MAX_BYTES while they arrive.
+
+    The multipart form is parsed (and spooled to disk) before the endpoint
+    runs, so the limit has to sit on the receive channel: by Content-Length
+    up front, and by counting body bytes for chunked uploads.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            limit = settings.VIDEO_MAX_BYTES
+            length = request.headers.get("content-length")
+            if length and length.isdigit() and int(length) > limit:
+                raise _too_large()
+            received = 0
+
+            async def receive():
+                nonlocal received
+                message = await request.receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit:
+                        raise _too_large()
+                return message
+
+            return await handler(Request(request.scope, receive))
+
+        return limited_handler
+
+
+router = APIRouter(prefix="/ai_trainer", tags=["AI Trainer"], route_class=UploadLimitRoute)
+
+
+@router.post("/{exercise_name}/analyze")
+async def analyze_recorded_workout(exercise_name: str, video: UploadFile = File(...),
+                                   sample_fps: float = None, mirror: bool = True):
+    """Count reps in a recorded workout video and return a rep-by-rep timeline."""
+    spec = EXERCISES.get(normalize_name(exercise_name))
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown exercise: {exercise_name}")
+
+    # OpenCV reads videos from a path, so the upload goes to a temp file first
+    suffix = os.path.splitext(video.filename or "")[1] or ".mp4"
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        # The body was already capped at VIDEO_MAX_BYTES by UploadLimitRoute
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await video.read(UPLOAD_CHUNK_SIZE):
+                await run_in_threadpool(out.write, chunk)
+
+        try:
+            return await run_in_threadpool(analyze_video, path, spec, sample_fps, mirror)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except PoolTimeout:
+            raise HTTPException(status_code=503, detail="All pose models are busy, try again later")
+    finally:
+        os.remove(path)
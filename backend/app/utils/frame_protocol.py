@@ -0,0 +1,141 @@
+import base64
+import binascii
+import struct
+
+import cv2
+import msgpack
+import numpy as np
+
+# Subprotocol a client offers to switch the trainer socket to binary frames:
+#   client -> server: raw JPEG bytes (one image per message)
+#   server -> client: RESULT_HEADER + feedback (utf-8) + annotated JPEG
+# Status and error messages are still sent as JSON text.
+BINARY_SUBPROTOCOL = "fitflow.jpeg.v1"
+
+# Subprotocol for compact binary messages both ways, each one a MessagePack map:
+#   client -> server: {"frame": <JPEG>}, {"landmarks": <float32 x, y, z, visibility per point>}
+#                     or {"options": {...}}
+#   server -> client: results with the frame as raw bytes and landmarks packed like the
+#                     client's; status, control and error messages are maps too
+MSGPACK_SUBPROTOCOL = "fitflow.msgpack.v1"
+
+# In order of preference when the client's offer doesn't settle it
+SUBPROTOCOLS = (MSGPACK_SUBPROTOCOL, BINARY_SUBPROTOCOL)
+
+PROTOCOL_VERSION = 1
+
+# version (u8), flags (u8), feedback length (u16), count (i32), dropped frames (u16)
+RESULT_HEADER = struct.Struct("!BBHiH")
+
+# "data:image/jpeg;base64," and the like; the comma is only looked for this far in
+DATA_URL_HEADER_MAX = 64
+
+FLAG_HAS_FRAME = 0x01
+FLAG_ERROR = 0x02
+
+
+def negotiate_subprotocol(offered):
+    """Pick a binary subprotocol if the client offered one, else None (JSON text)."""
+    for name in SUBPROTOCOLS:
+        if offered and name in offered:
+            return name
+    return None
+
+
+def decode_image(data):
+    """Decode a base64 data URL / base64 string or raw JPEG bytes into a BGR image."""
+    return decode_jpeg(image_bytes(data))
+
+
+def image_bytes(data):
+    """Raw JPEG bytes from a base64 data URL / base64 string (raw bytes pass through uncopied)."""
+    if isinstance(data, str):
+        # 🔹 Remove base64 header if present
+        comma = data.find(",", 0, DATA_URL_HEADER_MAX)
+        return binascii.a2b_base64(data[comma + 1:] if comma != -1 else data)
+    if data[:5] == b"data:":
+        # Data URL sent as bytes: skip the header through a view instead of a copy
+        comma = bytes(data[:DATA_URL_HEADER_MAX]).find(b",")
+        return binascii.a2b_base64(memoryview(data)[comma + 1:])
+    return data
+
+
+def decode_jpeg(data, flags=cv2.IMREAD_COLOR):
+    """Decode JPEG bytes into a BGR image (flags e.g. IMREAD_REDUCED_COLOR_2 for half size)."""
+    np_arr = np.frombuffer(data, np.uint8)
+    frame = cv2.imdecode(np_arr, flags)
+    if frame is None:
+        raise ValueError("Could not decode image")
+    return frame
+
+
+def encode_image(frame, quality=None):
+    """Encode a BGR image to JPEG bytes (quality 1-100, None for OpenCV's default)."""
+    params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)] if quality is not None else []
+    _, buffer = cv2.imencode('.jpg', frame, params)
+    return buffer.tobytes()
+
+
+def to_json_result(result):
+    """Base64 the annotated frame so the trainer result can go through json.dumps."""
+    frame = result.get("frame") if isinstance(result, dict) else None
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        result = dict(result)
+        result["frame"] = base64.b64encode(frame).decode('utf-8')
+    return result
+
+
+def pack_result(result):
+    """Pack a trainer result dict into a binary message (header + feedback + JPEG)."""
+    flags = 0
+    if "error" in result:
+        flags |= FLAG_ERROR
+        text = str(result["error"])
+    else:
+        text = result.get("feedback") or ""
+    frame = result.get("frame") or b""
+    if frame:
+        flags |= FLAG_HAS_FRAME
+
+    feedback = text.encode('utf-8')[:0xFFFF]
+    # Timed trainers (plank) report "time" instead of "count"
+    count = int(result.get("count", result.get("time", 0)) or 0)
+    dropped = min(int(result.get("dropped", 0)), 0xFFFF)
+
+    header = RESULT_HEADER.pack(PROTOCOL_VERSION, flags, len(feedback), count, dropped)
+    return b"".join((header, feedback, frame))
+
+
+def unpack_result(message):
+    """Inverse of pack_result, returns a dict with count, feedback/error and frame bytes."""
+    view = memoryview(message)
+    version, flags, feedback_len, count, dropped = RESULT_HEADER.unpack_from(view)
+    if version != PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported protocol version: {version}")
+    start = RESULT_HEADER.size
+    text = bytes(view[start:start + feedback_len]).decode('utf-8', errors='replace')
+    result = {"count": count, "dropped": dropped}
+    if flags & FLAG_ERROR:
+        result["error"] = text
+    else:
+        result["feedback"] = text
+    if flags & FLAG_HAS_FRAME:
+        result["frame"] = bytes(view[start + feedback_len:])
+    return result
+
+
+def pack_landmarks(points):
+    """Landmarks ([[x, y, z, visibility], ...] or Landmark tuples) as little-endian float32 bytes."""
+    return np.asarray(points, dtype="<f4").tobytes()
+
+
+def pack_message(message):
+    """Trainer result (or status / control / error message) as a MessagePack map."""
+    if isinstance(message, dict) and isinstance(message.get("landmarks"), list):
+        message = dict(message, landmarks=pack_landmarks(message["landmarks"]))
+    return msgpack.packb(message, use_bin_type=True)
+
+
+def unpack_message(data):
+    """Client MessagePack message; frame and landmarks stay bytes (see parse_landmarks)."""
+    return msgpack.unpackb(data, raw=False)
@@ -0,0 +1,176 @@
+import bisect
+import math
+import threading
+
+# Text exposition format served at /metrics
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; whole-frame and request latencies
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; single pipeline stages (decode, flip, inference, ...)
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for the metric types: one series per combination of label values.
+
+    Same calling convention as prometheus_client (metric.labels(*values).inc()),
+    without the dependency.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self._series.items())
+        for key, child in sorted(series):
+            lines.extend(self._render_series(key, child))
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _Value()
+
+    def _render_series(self, key, child):
+        return [f"{self.name}{self._label_text(key)} {_format(child.value)}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class _Buckets:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return _Buckets(self.buckets)
+
+    def _render_series(self, key, child):
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self._label_text(key, [('le', _format(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_format(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+
+def render():
+    """All metrics in the Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------
+# Trainer sockets
+# ----------------------------
+TRAINER_SESSIONS = Counter("trainer_sessions_total", "Trainer sessions started", ["exercise"])
+TRAINER_ACTIVE_SESSIONS = Gauge("trainer_active_sessions", "Trainer sessions currently connected", ["exercise"])
+TRAINER_FRAMES = Counter("trainer_frames_total", "Frames (or client landmark sets) processed", ["exercise"])
+TRAINER_FRAMES_DROPPED = Counter(
+    "trainer_frames_dropped_total", "Frames replaced by a newer one before the trainer got to them", ["exercise"])
+TRAINER_FRAME_ERRORS = Counter("trainer_frame_errors_total", "Frames whose result was an error", ["exercise"])
+TRAINER_FRAME_SECONDS = Histogram(
+    "trainer_frame_processing_seconds", "Time in the trainer per frame", ["exercise"])
+TRAINER_FRAME_LATENCY = Histogram(
+    "trainer_frame_latency_seconds", "Frame received to result sent, including waiting", ["exercise"])
+TRAINER_STAGE_SECONDS = Histogram(
+    "trainer_stage_seconds", "Time per pipeline stage per frame", ["stage", "exercise"], buckets=STAGE_BUCKETS)
+WEBSOCKET_ERRORS = Counter("websocket_errors_total", "WebSocket send / receive failures", ["direction"])
+
+# ----------------------------
+# Pose graphs
+# ----------------------------
+POSE_POOL_IN_USE = Gauge("pose_pool_in_use", "Pose graphs checked out", ["model_complexity"])
+POSE_POOL_CREATED = Gauge("pose_pool_created", "Pose graphs built", ["model_complexity"])
+POSE_POOL_WAITING = Gauge("pose_pool_waiting", "Sessions waiting for a Pose graph", ["model_complexity"])
+# Set from the pools' running totals at scrape time; they only grow, and start over with the process
+POSE_POOL_TIMEOUTS = Counter("pose_pool_timeouts_total", "Checkouts that timed out", ["model_complexity"])
+POSE_POOL_BUSY = Counter(
+    "pose_pool_busy_total", "Checkout attempts that found every graph in use", ["model_complexity"])
+
+# ----------------------------
+# REST routes
+# ----------------------------
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "REST request latency by route template", ["method", "route", "status"])
@@ -0,0 +1,134 @@
+"""Replay recorded trainer sessions through the rep counters, far faster than real time.
+
+Recordings (app/ai_trainer/recording.py: set TRAINER_RECORD_DIR and connect
+with ?record=1) hold the landmarks each frame's counter saw, so replaying
+them needs neither a camera nor the pose model.
+
+    cd backend
+    python -m benchmarks.replay_sessions recordings/                      # each through its own exercise
+    python -m benchmarks.replay_sessions recordings/ --check              # exit 1 if any count differs
+    python -m benchmarks.replay_sessions recordings/squats-*.npy --exercise lunges
+    python -m benchmarks.replay_sessions recordings/ --repeat 20 --json replay.json
+
+--check compares the count after every frame with the recorded one and
+reports the first frame where they part, which makes a directory of
+recordings a regression test for spec thresholds and the rep engine.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("paths", nargs="+", help="recordings (.npy) or directories of them")
+    parser.add_argument("--exercise", help="replay through this exercise's counter instead of the recorded one")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any count differs")
+    parser.add_argument("--repeat", type=int, default=1, help="replays per recording, for steadier timings")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def find_recordings(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, "*.npy"))))
+        else:
+            found.append(path)
+    return found
+
+
+def replay(records, spec):
+    """Count (or seconds held) after every frame, replayed with the recorded frame times"""
+    import numpy as np
+    from app.ai_trainer.rep_engine import RepCounter
+
+    results = RepCounter(spec).replay(
+        np.asarray(records["landmarks"], dtype=np.float64),
+        present=records["present"].tolist(),
+        timestamps=records["time"].tolist(),
+    )
+    return [result.get("count", result.get("time")) for result in results]
+
+
+def transitions(counts):
+    return sum(1 for before, after in zip(counts, counts[1:]) if after != before)
+
+
+def run_recording(path, args):
+    from app.ai_trainer.recording import load_recording
+    from app.ai_trainer.registry import EXERCISES, normalize_name
+
+    records, info = load_recording(path)
+    exercise = normalize_name(args.exercise or info.get("exercise") or "")
+    if exercise not in EXERCISES:
+        # Circuits switch counters mid-session; replay them per station with --exercise
+        return {"exercise": exercise or None, "skipped": "pass --exercise to pick a counter"}
+
+    recorded = records["count"].tolist()
+    elapsed = []
+    for _ in range(max(1, args.repeat)):
+        started = time.perf_counter()
+        counts = replay(records, EXERCISES[exercise])
+        elapsed.append(time.perf_counter() - started)
+    best = min(elapsed)
+
+    duration = float(records["time"][-1] - records["time"][0]) if len(records) else 0.0
+    mismatch = next((i for i, (a, b) in enumerate(zip(counts, recorded)) if a != b), None)
+    return {
+        "exercise": exercise,
+        "frames": len(records),
+        "seconds": round(duration, 1),
+        "replay_ms": round(1000 * best, 2),
+        "frames_per_second": round(len(records) / best) if best else None,
+        "realtime": round(duration / best) if best else None,
+        "recorded_count": recorded[-1] if recorded else None,
+        "replayed_count": counts[-1] if counts else None,
+        "recorded_transitions": transitions(recorded),
+        "replayed_transitions": transitions(counts),
+        # Only meaningful through the recorded exercise's own counter
+        "first_mismatch": mismatch if not args.exercise else None,
+    }
+
+
+def print_table(results):
+    header = (f"{'recording':<40}{'exercise':<12}{'frames':>8}{'sec':>8}{'replay ms':>11}{'x realtime':>12}"
+              f"{'recorded':>10}{'replayed':>10}  mismatch")
+    print(header)
+    print("-" * len(header))
+    for path, r in results.items():
+        name = os.path.basename(path)[:39]
+        if "skipped" in r:
+            print(f"{name:<40}{r['exercise'] or '-':<12}  skipped: {r['skipped']}")
+            continue
+        mismatch = "-" if r["first_mismatch"] is None else f"frame {r['first_mismatch']}"
+        print(f"{name:<40}{r['exercise']:<12}{r['frames']:>8}{r['seconds']:>8.1f}{r['replay_ms']:>11.2f}"
+              f"{r['realtime'] or 0:>12}{r['recorded_count']:>10}{r['replayed_count']:>10}  {mismatch}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = find_recordings(args.paths)
+    if not paths:
+        raise SystemExit("No recordings found")
+
+    results = {path: run_recording(path, args) for path in paths}
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"exercise": args.exercise, "repeat": args.repeat, "recordings": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+    if args.check:
+        failed = [path for path, r in results.items() if r.get("first_mismatch") is not None]
+        if failed:
+            raise SystemExit(f"{len(failed)} recording(s) no longer count the same: "
+                             + ", ".join(os.path.basename(p) for p in failed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Per-stage timings of the trainer frame pipeline, per exercise.
+
+Replays a fixed frame corpus through every exercise's trainer exactly as the
+socket does (process_frame, then the base64 step of the JSON reply) and
+reports how long each stage takes and how many frames per second a session
+and a core can do.
+
+    cd backend
+    python -m benchmarks.trainer_pipeline --stub                    # no model, fake skeleton
+    python -m benchmarks.trainer_pipeline --corpus clip.mp4 --json before.json
+    python -m benchmarks.trainer_pipeline --exercises squats,plank --option echo=0
+
+Without --corpus the frames are drawn from the stub skeleton with a fixed
+seed, so runs on the same build are comparable.
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+STAGES = ["b64decode", "imdecode", "flip", "prepare", "inference", "tracking", "counter", "draw", "imencode",
+          "b64encode"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--stub", action="store_true", help="deterministic fake pose backend instead of MediaPipe")
+    parser.add_argument("--corpus", help="video file or directory of images (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=60, help="frames in the corpus (default 60)")
+    parser.add_argument("--size", default="640x480", help="synthetic frame size / max size of loaded frames")
+    parser.add_argument("--repeat", type=int, default=2, help="passes over the corpus per exercise")
+    parser.add_argument("--warmup", type=int, default=5, help="frames run before timing starts")
+    parser.add_argument("--exercises", default="", help="comma separated (default: all)")
+    parser.add_argument("--binary", action="store_true", help="raw JPEG in and out, no base64 (binary subprotocol)")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE",
+                        help="session option, as in the socket query string (repeatable)")
+    parser.add_argument("--hold-checks", action="store_true",
+                        help="keep low-rate hold checks (plank, wall sits); off so every frame runs the full path")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def synthetic_corpus(count, width, height, seed=0):
+    """JPEG frames of the stub skeleton on a noisy gradient background"""
+    import cv2
+    import numpy as np
+    from app.ai_trainer.landmarks import LANDMARK_NAMES
+    from app.ai_trainer.stub_pose import stub_points
+
+    rng = np.random.default_rng(seed)
+    background = np.linspace(40, 200, width, dtype=np.float32)[None, :, None].repeat(height, 0).repeat(3, 2)
+    bones = [("leftShoulder", "rightShoulder"), ("leftShoulder", "leftElbow"), ("leftElbow", "leftWrist"),
+             ("rightShoulder", "rightElbow"), ("rightElbow", "rightWrist"), ("leftShoulder", "leftHip"),
+             ("rightShoulder", "rightHip"), ("leftHip", "rightHip"), ("leftHip", "leftKnee"),
+             ("leftKnee", "leftAnkle"), ("rightHip", "rightKnee"), ("rightKnee", "rightAnkle")]
+    index = {name: i for i, name in enumerate(LANDMARK_NAMES)}
+    frames = []
+    for i in range(count):
+        image = np.clip(background + rng.normal(0, 8, background.shape), 0, 255).astype(np.uint8)
+        points = [(int(x * width), int(y * height)) for x, y in stub_points(i)]
+        for a, b in bones:
+            cv2.line(image, points[index[a]], points[index[b]], (230, 210, 190), max(2, width // 40))
+        cv2.circle(image, points[index["nose"]], max(4, width // 25), (200, 190, 180), -1)
+        frames.append(cv2.imencode(".jpg", image)[1].tobytes())
+    return frames
+
+
+def load_corpus(path, count, width, height):
+    """JPEG frames from a video or an image directory, downscaled to fit width x height"""
+    import cv2
+
+    def fit(image):
+        scale = min(1.0, width / image.shape[1], height / image.shape[0])
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return cv2.imencode(".jpg", image)[1].tobytes()
+
+    if os.path.isdir(path):
+        files = sorted(f for f in glob.glob(os.path.join(path, "*"))
+                       if f.lower().endswith((".jpg", ".jpeg", ".png")))
+        return [fit(cv2.imread(f)) for f in files[:count]]
+
+    frames = []
+    capture = cv2.VideoCapture(path)
+    try:
+        while len(frames) < count:
+            ok, image = capture.read()
+            if not ok:
+                break
+            frames.append(fit(image))
+    finally:
+        capture.release()
+    return frames
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(1000 * statistics.fmean(ordered), 3),
+        "p50_ms": round(1000 * ordered[len(ordered) // 2], 3),
+        "p95_ms": round(1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+def run_exercise(name, payloads, args, options):
+    from app.ai_trainer.registry import get_trainer_class
+    from app.ai_trainer.stage_timer import StageTimer
+    from app.utils.frame_protocol import to_json_result
+
+    trainer = get_trainer_class(name)()
+    trainer.set_options(options)
+    if not args.hold_checks and getattr(trainer, "hold", None) is not None:
+        trainer.hold = None
+    try:
+        for payload in payloads[:args.warmup]:
+            trainer.process_frame(payload)
+
+        timer = trainer.stage_timer = StageTimer()
+        totals, errors = [], 0
+        wall, cpu = time.perf_counter(), time.process_time()
+        for _ in range(args.repeat):
+            for payload in payloads:
+                started = time.perf_counter()
+                result = trainer.process_frame(payload)
+                if "error" in result:
+                    errors += 1
+                if not args.binary:
+                    timer.start()
+                    to_json_result(result)
+                    timer.lap("b64encode")
+                totals.append(time.perf_counter() - started)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    finally:
+        trainer.close()
+
+    frames = len(totals)
+    return {
+        "frames": frames,
+        "errors": errors,
+        "fps": round(frames / wall, 1),
+        # MediaPipe runs its own threads, so this can be lower than fps on a multi-core box
+        "fps_per_core": round(frames / cpu, 1) if cpu else None,
+        "total": summarize(totals),
+        "stages": {stage: summarize(timer.samples[stage]) for stage in STAGES if stage in timer.samples},
+    }
+
+
+def print_table(results):
+    stages = [stage for stage in STAGES if any(stage in r["stages"] for r in results.values())]
+    header = f"{'exercise':<18}" + "".join(f"{stage:>11}" for stage in stages) + f"{'total':>10}{'fps':>8}{'fps/core':>10}"
+    print("mean ms per frame")
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        cells = "".join(f"{r['stages'][s]['mean_ms']:>11.2f}" if s in r["stages"] else f"{'-':>11}"
+                        for s in stages)
+        per_core = f"{r['fps_per_core']:>10.1f}" if r["fps_per_core"] else f"{'-':>10}"
+        print(f"{name:<18}{cells}{r['total']['mean_ms']:>10.2f}{r['fps']:>8.1f}{per_core}"
+              + (f"  ({r['errors']} errors)" if r["errors"] else ""))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.stub:
+        # Read by app.config.settings, so it has to be set before the app is imported
+        os.environ["POSE_BACKEND"] = "stub"
+
+    import base64
+
+    import cv2
+    from app.ai_trainer.registry import EXERCISES
+    from app.config import settings
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    if args.corpus:
+        frames = load_corpus(args.corpus, args.frames, width, height)
+        if not frames:
+            raise SystemExit(f"No frames read from {args.corpus}")
+    else:
+        frames = synthetic_corpus(args.frames, width, height)
+    if args.binary:
+        payloads = frames
+    else:
+        payloads = ["data:image/jpeg;base64," + base64.b64encode(frame).decode() for frame in frames]
+
+    names = [n.strip() for n in args.exercises.split(",") if n.strip()] or list(EXERCISES)
+    unknown = [n for n in names if n not in EXERCISES]
+    if unknown:
+        raise SystemExit(f"Unknown exercise: {', '.join(unknown)}")
+    options = dict(option.split("=", 1) for option in args.option)
+
+    print(f"backend={settings.POSE_BACKEND} frames={len(frames)}x{args.repeat} size={args.size} "
+          f"{'binary' if args.binary else 'json'} opencv={cv2.__version__} cpus={os.cpu_count()}")
+    results = {}
+    for name in names:
+        results[name] = run_exercise(name, payloads, args, options)
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "backend": settings.POSE_BACKEND,
+                "frames": len(frames),
+                "repeat": args.repeat,
+                "size": args.size,
+                "binary": args.binary,
+                "options": options,
+                "exercises": results,
+            }, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
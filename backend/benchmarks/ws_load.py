@@ -0,0 +1,270 @@
+"""Load generator for the trainer WebSocket.
+
+Opens many concurrent sessions on /ws/ai_trainer/{exercise}, sends frames at a
+fixed rate from a recorded or synthetic corpus, and reports round-trip
+latency (p50/p95/p99), throughput and error rates per exercise.
+
+    cd backend
+    # In-process server on a loopback port, fake pose backend: 100 sessions for 20 s
+    python -m benchmarks.ws_load --stub --sessions 100 --fps 5 --duration 20
+    # Find the ceiling: several load levels in a row
+    python -m benchmarks.ws_load --stub --sessions 10,50,100,200 --exercises squats,plank
+    # Against a server that is already running
+    python -m benchmarks.ws_load --url ws://127.0.0.1:8000 --sessions 50 --binary
+    # MessagePack subprotocol; --landmarks sends client-side landmarks instead of frames
+    python -m benchmarks.ws_load --stub --sessions 200 --msgpack --landmarks
+
+Round trip is measured per processed frame. The server answers frames in
+order and reports with every result how many it took without answering
+(replaced by a newer frame, or waited out for a free Pose graph), so the
+result after `dropped` unanswered frames belongs to the next one sent.
+"""
+import argparse
+import asyncio
+import base64
+import collections
+import json
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlencode
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="ws://host:port of a running server (default: start one in-process)")
+    parser.add_argument("--stub", action="store_true", help="in-process server uses the fake pose backend")
+    parser.add_argument("--sessions", default="50", help="concurrent sessions; comma separated to run several levels")
+    parser.add_argument("--exercises", default="squats", help="comma separated, sessions are spread round-robin")
+    parser.add_argument("--fps", type=float, default=5.0, help="frames per second per session")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of sending per level")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which sessions connect")
+    parser.add_argument("--corpus", help="video file or directory of images (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=60, help="frames in the corpus")
+    parser.add_argument("--size", default="640x480", help="synthetic frame size / max size of loaded frames")
+    parser.add_argument("--binary", action="store_true", help="use the binary JPEG subprotocol")
+    parser.add_argument("--msgpack", action="store_true", help="use the MessagePack subprotocol")
+    parser.add_argument("--landmarks", action="store_true",
+                        help="send landmarks (as the browser's pose detection would) instead of frames")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE",
+                        help="session option sent in the query string (repeatable)")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+class SessionStats:
+    def __init__(self):
+        self.sent = 0
+        self.results = 0
+        self.dropped = 0
+        self.errors = 0
+        self.connect_errors = 0
+        self.rtts = []
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_session(url, payloads, args, stats, start_at, stop_at):
+    import websockets
+    from app.utils.frame_protocol import BINARY_SUBPROTOCOL, MSGPACK_SUBPROTOCOL, unpack_message, unpack_result
+
+    await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+    subprotocols = [MSGPACK_SUBPROTOCOL] if args.msgpack else [BINARY_SUBPROTOCOL] if args.binary else None
+    try:
+        connection = await websockets.connect(url, subprotocols=subprotocols, max_size=None)
+    except Exception:
+        stats.connect_errors += 1
+        return
+
+    pending = collections.deque()
+
+    async def receive():
+        async for message in connection:
+            now = time.monotonic()
+            if args.msgpack:
+                result = unpack_message(message)
+            elif isinstance(message, bytes):
+                result = unpack_result(message)
+            else:
+                result = json.loads(message)
+            if "control" in result or "status" in result:
+                continue
+            if "error" in result:
+                stats.errors += 1
+            dropped = result.get("dropped", 0) or 0
+            stats.dropped += dropped
+            for _ in range(min(dropped, len(pending))):
+                pending.popleft()
+            if pending:
+                stats.rtts.append(now - pending.popleft())
+            stats.results += 1
+
+    receiver = asyncio.create_task(receive())
+    interval = 1.0 / args.fps
+    next_send = time.monotonic()
+    index = 0
+    try:
+        while next_send < stop_at and not receiver.done():
+            pending.append(time.monotonic())
+            await connection.send(payloads[index % len(payloads)])
+            stats.sent += 1
+            index += 1
+            # Absolute schedule, so slow sends don't lower the rate
+            next_send += interval
+            await asyncio.sleep(max(0.0, next_send - time.monotonic()))
+        # Results for the last frames still in flight
+        await asyncio.sleep(min(2.0, 5 * interval))
+    except Exception:
+        stats.errors += 1
+    finally:
+        receiver.cancel()
+        try:
+            await connection.close()
+        except Exception:
+            pass
+
+
+async def run_level(base_url, sessions, exercises, payloads, args):
+    query = urlencode(dict(option.split("=", 1) for option in args.option))
+    stats = {exercise: [] for exercise in exercises}
+    start = time.monotonic() + 0.5
+    tasks = []
+    for i in range(sessions):
+        exercise = exercises[i % len(exercises)]
+        session = SessionStats()
+        stats[exercise].append(session)
+        start_at = start + args.ramp * i / max(1, sessions)
+        url = f"{base_url}/ws/ai_trainer/{exercise}" + (f"?{query}" if query else "")
+        tasks.append(run_session(url, payloads, args, session, start_at, start_at + args.duration))
+    await asyncio.gather(*tasks)
+    return {exercise: summarize(sessions_stats, args.duration) for exercise, sessions_stats in stats.items()}
+
+
+def summarize(sessions, duration):
+    rtts = sorted(rtt for s in sessions for rtt in s.rtts)
+    sent = sum(s.sent for s in sessions)
+    results = sum(s.results for s in sessions)
+    errors = sum(s.errors for s in sessions)
+    connect_errors = sum(s.connect_errors for s in sessions)
+
+    def ms(value):
+        return None if value is None else round(1000 * value, 1)
+
+    return {
+        "sessions": len(sessions),
+        "sent": sent,
+        "results": results,
+        "dropped": sum(s.dropped for s in sessions),
+        "errors": errors,
+        "connect_errors": connect_errors,
+        "error_rate": round((errors + connect_errors) / max(1, results + connect_errors), 4),
+        "throughput": round(results / duration, 1),
+        "p50_ms": ms(percentile(rtts, 0.50)),
+        "p95_ms": ms(percentile(rtts, 0.95)),
+        "p99_ms": ms(percentile(rtts, 0.99)),
+    }
+
+
+def print_level(sessions, results):
+    print(f"\n{sessions} sessions")
+    header = (f"{'exercise':<18}{'sessions':>9}{'sent':>8}{'results':>9}{'dropped':>9}{'errors':>8}"
+              f"{'res/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    print(header)
+    print("-" * len(header))
+    for exercise, r in results.items():
+        print(f"{exercise:<18}{r['sessions']:>9}{r['sent']:>8}{r['results']:>9}{r['dropped']:>9}"
+              f"{r['errors'] + r['connect_errors']:>8}{r['throughput']:>8.1f}"
+              + "".join(f"{'-' if r[k] is None else r[k]:>9}" for k in ("p50_ms", "p95_ms", "p99_ms")))
+
+
+def make_payloads(frames, args):
+    """Messages to send, one per corpus frame, in the chosen protocol"""
+    from app.ai_trainer.landmarks import LANDMARK_NAMES
+    from app.ai_trainer.stub_pose import stub_points
+    from app.utils.frame_protocol import pack_landmarks, pack_message
+
+    if args.landmarks:
+        # The stub skeleton's points: the in-page PoseLandmarker sends named {x, y, z, visibility}
+        points = [[(x, y, 0.0, 0.99) for x, y in stub_points(i)] for i in range(len(frames))]
+        if args.msgpack:
+            return [pack_message({"landmarks": pack_landmarks(p)}) for p in points]
+        return [json.dumps({"landmarks": {name: {"x": x, "y": y, "z": z, "visibility": v}
+                                          for name, (x, y, z, v) in zip(LANDMARK_NAMES, p)}})
+                for p in points]
+    if args.msgpack:
+        return [pack_message({"frame": frame}) for frame in frames]
+    if args.binary:
+        return frames
+    return [json.dumps({"frame": "data:image/jpeg;base64," + base64.b64encode(frame).decode()}) for frame in frames]
+
+
+def start_local_server():
+    """Run the app with uvicorn on a free loopback port in a background thread"""
+    import uvicorn
+    from app.main import app
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise SystemExit("In-process server didn't start")
+        time.sleep(0.05)
+    return server, thread, f"ws://127.0.0.1:{port}"
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.stub:
+        # Read by app.config.settings, so it has to be set before the app is imported
+        os.environ["POSE_BACKEND"] = "stub"
+
+    from benchmarks.trainer_pipeline import load_corpus, synthetic_corpus
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    frames = load_corpus(args.corpus, args.frames, width, height) if args.corpus \
+        else synthetic_corpus(args.frames, width, height)
+    if not frames:
+        raise SystemExit(f"No frames read from {args.corpus}")
+    payloads = make_payloads(frames, args)
+
+    server = thread = None
+    url = args.url.rstrip("/") if args.url else None
+    if url is None:
+        server, thread, url = start_local_server()
+
+    exercises = [e.strip() for e in args.exercises.split(",") if e.strip()]
+    levels = [int(n) for n in args.sessions.split(",")]
+    protocol = "msgpack" if args.msgpack else "binary" if args.binary else "json"
+    print(f"{url} {protocol}{' landmarks' if args.landmarks else ''} {args.fps} fps/session, {len(frames)} frames "
+          f"{args.size}, cpus={os.cpu_count()}" + (" (in-process server shares this process)" if server else ""))
+    report = []
+    try:
+        for sessions in levels:
+            results = asyncio.run(run_level(url, sessions, exercises, payloads, args))
+            print_level(sessions, results)
+            report.append({"sessions": sessions, "exercises": results})
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"url": url, "fps": args.fps, "duration": args.duration, "protocol": protocol,
+                       "landmarks": args.landmarks,
+                       "cpus": os.cpu_count(), "levels": report}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
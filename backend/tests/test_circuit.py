@@ -0,0 +1,44 @@
+"""Circuit sessions: one landmark stream feeding several station counters."""
+import math
+
+from app.ai_trainer.landmarks import LANDMARK_INDEX, NUM_LANDMARKS, Landmark
+from app.ai_trainer.registry import EXERCISES, get_trainer_class
+
+
+def elbow_pose(angle):
+    """Landmarks with the left elbow bent to angle degrees"""
+    points = [Landmark(0.5, 0.5, 0.0, 1.0)] * NUM_LANDMARKS
+    radians = math.radians(angle)
+    points[LANDMARK_INDEX["leftShoulder"]] = Landmark(0.5, 0.3, 0.0, 1.0)
+    points[LANDMARK_INDEX["leftWrist"]] = Landmark(0.5 + 0.2 * math.sin(radians), 0.5 - 0.2 * math.cos(radians),
+                                                   0.0, 1.0)
+    return points
+
+
+def test_circuit_advances_without_target():
+    # Push-ups have no set length: the station ends at the spec's own target
+    trainer = get_trainer_class("circuit")()
+    trainer.set_options({"exercises": "pushups,tricepdips"})
+    target = EXERCISES["pushups"].target
+
+    result = trainer.process_landmarks(elbow_pose(170))
+    for _ in range(target):
+        assert result["station"] == 0
+        trainer.process_landmarks(elbow_pose(60))
+        result = trainer.process_landmarks(elbow_pose(170))
+
+    assert result["stations"][0] == {"exercise": "pushups", "count": target}
+    assert result["feedback"] == "✅ Station done! Next: tricepdips"
+    assert trainer.active == 1
+    assert trainer.process_landmarks(elbow_pose(80))["exercise"] == "tricepdips"
+    trainer.close()
+
+
+def test_circuit_target_option_wins():
+    trainer = get_trainer_class("circuit")()
+    trainer.set_options({"exercises": "pushups,tricepdips", "target": "2"})
+    for _ in range(2):
+        trainer.process_landmarks(elbow_pose(60))
+        trainer.process_landmarks(elbow_pose(170))
+    assert trainer.active == 1
+    trainer.close()
@@ -0,0 +1,55 @@
+"""Session lanes must release their trainer however the WebSocket handler ends."""
+import asyncio
+
+from app.ai_trainer.executor import FrameExecutor, _sessions
+
+
+class Trainer:
+    closed = 0
+
+    def ping(self):
+        return "pong"
+
+    def close(self):
+        Trainer.closed += 1
+
+
+def test_close_after_shutdown_releases_trainer():
+    async def session():
+        executor = FrameExecutor(workers=1, kind="thread")
+        lane = executor.session(Trainer)
+        assert await lane.call("ping") == "pong"
+        executor.shutdown()
+        # Submitting would raise "cannot schedule new futures after shutdown"
+        await lane.close()
+        return lane
+
+    Trainer.closed = 0
+    lane = asyncio.run(session())
+    assert Trainer.closed == 1
+    assert lane._session_id not in _sessions
+
+
+def test_shielded_close_survives_cancellation():
+    async def session():
+        executor = FrameExecutor(workers=1, kind="thread")
+        lane = executor.session(Trainer)
+        await lane.call("ping")
+
+        async def handler():
+            await asyncio.shield(lane.close())
+
+        task = asyncio.create_task(handler())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # The release keeps going after the handler is cancelled
+        for _ in range(100):
+            if Trainer.closed:
+                break
+            await asyncio.sleep(0.01)
+        executor.shutdown()
+
+    Trainer.closed = 0
+    asyncio.run(session())
+    assert Trainer.closed == 1
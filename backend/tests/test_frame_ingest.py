@@ -0,0 +1,81 @@
+"""Frame ingest: zero-copy JPEG access and reduced-resolution decode for the pose model."""
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from app.ai_trainer import base_trainer
+from app.ai_trainer.frame_ingest import FrameIngest
+from app.ai_trainer.pose_input import PoseInput
+from app.ai_trainer.pose_pool import PosePool
+from app.ai_trainer.registry import get_trainer_class
+from app.config import settings
+
+
+def jpeg(width, height):
+    image = np.zeros((height, width, 3), np.uint8)
+    image[:, width // 2:] = 255
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+@pytest.mark.parametrize("factor", [1, 2, 4, 8])
+def test_reduced_decode_scales_and_remembers_the_source_size(factor):
+    ingest = FrameIngest(reduced=True)
+    frame = ingest.decode(jpeg(1280, 720), factor)
+    assert frame.shape == (720 // factor, 1280 // factor, 3)
+    assert ingest.factor == factor
+    assert ingest.source_size == (1280, 720)
+
+
+def test_reduced_decode_can_be_turned_off():
+    ingest = FrameIngest(reduced=False)
+    assert ingest.decode(jpeg(1280, 720), 4).shape == (720, 1280, 3)
+    assert ingest.factor == 1
+
+
+def test_jpeg_bytes_are_not_copied():
+    data = jpeg(64, 48)
+    ingest = FrameIngest()
+    assert ingest.jpeg(data) is data
+    data_url = b"data:image/jpeg;base64," + base64.b64encode(data)
+    assert bytes(ingest.jpeg(data_url)) == data
+
+
+@pytest.mark.parametrize("size, factor", [
+    ((1920, 1080), 4),   # 480 px left at 1/4, 240 at 1/8: under the model's 256
+    ((1280, 720), 4),
+    ((640, 480), 2),
+    ((320, 240), 1),
+    (None, 1),           # first frame: full resolution unknown
+])
+def test_reduction_keeps_the_model_resolution(size, factor):
+    assert PoseInput(max_side=256, roi=False).reduction(size) == factor
+
+
+def test_reduction_follows_the_roi():
+    pose_input = PoseInput(max_side=256, roi=True)
+    pose_input.roi = (0.25, 0.0, 0.75, 0.5)
+    # A 960 x 540 crop of a 1920 x 1080 frame: only a 2x reduction keeps 256 px
+    assert pose_input.reduction((1920, 1080)) == 2
+
+
+@pytest.mark.parametrize("echo, factor", [("0", 4), ("1", 1)])
+def test_landmark_sessions_decode_reduced(monkeypatch, echo, factor):
+    monkeypatch.setattr(settings, "POSE_BACKEND", "stub")
+    monkeypatch.setattr(settings, "POSE_INPUT_SIZE", 256)
+    monkeypatch.setattr(settings, "FRAME_REDUCED_DECODE", True)
+    pool = PosePool(size=1)
+    monkeypatch.setattr(base_trainer, "pose_pool_for", lambda model_complexity=None: pool)
+    trainer = get_trainer_class("squats")()
+    trainer.set_options({"echo": echo})
+
+    frame = jpeg(1280, 720)
+    for _ in range(2):
+        result = trainer.process_frame(frame)
+        assert "error" not in result
+    trainer.close()
+
+    # Only frames nobody sees again are decoded small; the first one sets the source size
+    assert trainer.ingest.factor == factor
+    assert trainer.ingest.source_size == (1280, 720)
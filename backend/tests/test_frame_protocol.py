@@ -0,0 +1,118 @@
+"""Trainer socket wire formats: frames in, packed results out."""
+import base64
+
+import cv2
+import msgpack
+import numpy as np
+import pytest
+
+from app.ai_trainer.landmarks import NUM_LANDMARKS, Landmark, parse_landmarks
+from app.utils.frame_protocol import (
+    BINARY_SUBPROTOCOL, MSGPACK_SUBPROTOCOL, PROTOCOL_VERSION, RESULT_HEADER, decode_image, image_bytes,
+    negotiate_subprotocol, pack_landmarks, pack_message, pack_result, to_json_result, unpack_message, unpack_result,
+)
+
+
+@pytest.fixture(scope="module")
+def jpeg():
+    image = np.zeros((48, 64, 3), np.uint8)
+    image[:, 32:] = (0, 0, 255)
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+def test_binary_subprotocol_is_negotiated_only_when_offered():
+    assert negotiate_subprotocol([BINARY_SUBPROTOCOL]) == BINARY_SUBPROTOCOL
+    assert negotiate_subprotocol(["other", BINARY_SUBPROTOCOL]) == BINARY_SUBPROTOCOL
+    assert negotiate_subprotocol(["other"]) is None
+    assert negotiate_subprotocol(None) is None
+
+
+def test_frames_decode_from_every_accepted_form(jpeg):
+    encoded = base64.b64encode(jpeg).decode()
+    data_url = "data:image/jpeg;base64," + encoded
+    assert image_bytes(jpeg) is jpeg
+    assert image_bytes(encoded) == jpeg
+    assert image_bytes(data_url) == jpeg
+    assert bytes(image_bytes(data_url.encode())) == jpeg
+
+    frame = decode_image(jpeg)
+    assert frame.shape == (48, 64, 3)
+    assert frame[0, 60, 2] > 200 and frame[0, 4, 2] < 50
+
+
+def test_undecodable_frame_raises(jpeg):
+    with pytest.raises(ValueError, match="Could not decode image"):
+        decode_image(b"not a jpeg")
+
+
+def test_result_round_trip(jpeg):
+    message = pack_result({"count": 7, "feedback": "Go down! ✅", "frame": jpeg, "dropped": 3, "angle": 88.0})
+    version, flags, _, count, dropped = RESULT_HEADER.unpack_from(message)
+    assert (version, count, dropped) == (PROTOCOL_VERSION, 7, 3)
+
+    assert unpack_result(message) == {"count": 7, "dropped": 3, "feedback": "Go down! ✅", "frame": jpeg}
+
+
+def test_result_without_frame_time_and_error():
+    # Hold trainers report time; frame=None (frame_every) and errors carry no image
+    assert unpack_result(pack_result({"time": 12, "feedback": "Hold it!", "frame": None})) == {
+        "count": 12, "dropped": 0, "feedback": "Hold it!"}
+    assert unpack_result(pack_result({"error": "Could not decode image"})) == {
+        "count": 0, "dropped": 0, "error": "Could not decode image"}
+
+
+def test_dropped_count_saturates_and_version_is_checked():
+    assert unpack_result(pack_result({"count": 1, "dropped": 100000}))["dropped"] == 0xFFFF
+
+    message = bytearray(pack_result({"count": 1}))
+    message[0] = PROTOCOL_VERSION + 1
+    with pytest.raises(ValueError, match="Unsupported protocol version"):
+        unpack_result(bytes(message))
+
+
+def test_json_results_carry_the_frame_as_base64(jpeg):
+    result = {"count": 1, "frame": jpeg}
+    assert to_json_result(result) == {"count": 1, "frame": base64.b64encode(jpeg).decode()}
+    # The trainer's dict is left alone
+    assert result["frame"] is jpeg
+    assert to_json_result({"count": 1, "landmarks": None}) == {"count": 1, "landmarks": None}
+
+
+def test_msgpack_is_preferred_over_binary():
+    assert negotiate_subprotocol([BINARY_SUBPROTOCOL, MSGPACK_SUBPROTOCOL]) == MSGPACK_SUBPROTOCOL
+    assert negotiate_subprotocol([MSGPACK_SUBPROTOCOL]) == MSGPACK_SUBPROTOCOL
+
+
+def test_msgpack_client_messages(jpeg):
+    points = [[i / 100, 1 - i / 100, 0.01 * i, 0.5] for i in range(NUM_LANDMARKS)]
+    frame = unpack_message(msgpack.packb({"frame": jpeg}, use_bin_type=True))
+    landmarks = unpack_message(msgpack.packb({"landmarks": pack_landmarks(points)}, use_bin_type=True))
+    options = unpack_message(msgpack.packb({"options": {"echo": "0"}}, use_bin_type=True))
+
+    # Frames and landmarks stay bytes, ready for decode_image / parse_landmarks
+    assert frame == {"frame": jpeg}
+    assert decode_image(frame["frame"]).shape == (48, 64, 3)
+    parsed = parse_landmarks(landmarks["landmarks"])
+    assert len(parsed) == NUM_LANDMARKS and isinstance(parsed[0], Landmark)
+    assert np.allclose(parsed, points)
+    assert options == {"options": {"echo": "0"}}
+
+
+def test_msgpack_packed_landmarks_must_be_33_points():
+    with pytest.raises(ValueError, match="33 x 4 float32"):
+        parse_landmarks(pack_landmarks([[0.5, 0.5, 0.0, 1.0]] * 32))
+
+
+def test_msgpack_results(jpeg):
+    points = [[0.25, 0.75, 0.0, 0.5]] * NUM_LANDMARKS
+    result = {"count": 3, "feedback": "Stand tall", "frame": jpeg, "landmarks": points, "angle": 171.5}
+    unpacked = msgpack.unpackb(pack_message(result), raw=False)
+
+    # Frame as raw bytes, landmarks as float32 like the client's, the rest as is
+    assert unpacked["frame"] == jpeg
+    assert np.frombuffer(unpacked["landmarks"], "<f4").reshape(NUM_LANDMARKS, 4).tolist() == points
+    assert {k: v for k, v in unpacked.items() if k not in ("frame", "landmarks")} == {
+        "count": 3, "feedback": "Stand tall", "angle": 171.5}
+    assert result["landmarks"] is points
+    assert msgpack.unpackb(pack_message({"landmarks": None}), raw=False) == {"landmarks": None}
+    assert msgpack.unpackb(pack_message({"control": {"fps": 5.0}}), raw=False) == {"control": {"fps": 5.0}}
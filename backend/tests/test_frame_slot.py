@@ -0,0 +1,46 @@
+"""Latest-frame-wins mailbox between the socket reader and the trainer."""
+import asyncio
+
+from app.ai_trainer.frame_slot import LatestFrameSlot
+
+
+def test_newest_frame_wins_and_drops_are_counted():
+    async def session():
+        slot = LatestFrameSlot()
+        for frame in ("a", "b", "c"):
+            slot.put(frame)
+        first = await slot.get()
+        slot.put("d")
+        second = await slot.get()
+        return first, second
+
+    # Two frames replaced before the trainer got to them, then none
+    assert asyncio.run(session()) == (("c", 2), ("d", 0))
+
+
+def test_get_waits_for_the_next_frame():
+    async def session():
+        slot = LatestFrameSlot()
+        waiting = asyncio.create_task(slot.get())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        slot.put("a")
+        return await asyncio.wait_for(waiting, 1)
+
+    assert asyncio.run(session()) == ("a", 0)
+
+
+def test_close_wakes_the_reader_and_discards_the_pending_frame():
+    async def session():
+        slot = LatestFrameSlot()
+        waiting = asyncio.create_task(slot.get())
+        await asyncio.sleep(0)
+        slot.close()
+        closed = await asyncio.wait_for(waiting, 1)
+
+        slot = LatestFrameSlot()
+        slot.put("a")
+        slot.close()
+        return closed, await slot.get()
+
+    assert asyncio.run(session()) == (None, None)
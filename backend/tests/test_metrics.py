@@ -0,0 +1,30 @@
+"""Prometheus text exposition of the in-house metric types."""
+from app.utils import metrics
+
+
+def test_monotonic_series_are_counters():
+    # rate() and increase() only handle restarts for counters
+    text = metrics.render()
+    for name in ("trainer_frames_total", "trainer_frames_dropped_total", "pose_pool_timeouts_total",
+                 "pose_pool_busy_total"):
+        assert f"# TYPE {name} counter" in text
+    for metric in metrics._registry:
+        assert (metric.kind == "counter") == metric.name.endswith("_total"), metric.name
+
+
+def test_counter_series_render_with_labels():
+    counter = metrics.Counter("test_events_total", "Events", ["kind"])
+    try:
+        counter.labels("a").inc()
+        counter.labels("a").inc(2)
+        counter.labels('b"').inc()
+        lines = counter.render()
+    finally:
+        metrics._registry.remove(counter)
+
+    assert lines == [
+        "# HELP test_events_total Events",
+        "# TYPE test_events_total counter",
+        'test_events_total{kind="a"} 3.0',
+        'test_events_total{kind="b\\""} 1.0',
+    ]
@@ -0,0 +1,83 @@
+"""Shared Pose graph pool: lazy growth, non-blocking checkout for live sessions, slot accounting."""
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from app.ai_trainer import base_trainer, pose_pool
+from app.ai_trainer.pose_pool import PosePool, PoolTimeout
+from app.ai_trainer.registry import get_trainer_class
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def stub_backend(monkeypatch):
+    monkeypatch.setattr(settings, "POSE_BACKEND", "stub")
+
+
+def test_pool_grows_lazily_and_reuses_released_graphs():
+    pool = PosePool(size=2, timeout=0)
+    assert pool.stats()["created"] == 0
+
+    first, second = pool.try_acquire(), pool.try_acquire()
+    assert first is not None and second is not None and first is not second
+    # Full: live sessions get None right away instead of blocking a trainer worker
+    assert pool.try_acquire() is None
+    assert pool.stats()["busy"] == 1
+
+    pool.release(first)
+    assert pool.try_acquire() is first
+    assert pool.stats()["created"] == 2
+
+
+def test_acquire_waits_for_a_release_and_times_out():
+    pool = PosePool(size=1, timeout=0.05)
+    pose = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+
+    threading.Timer(0.05, pool.release, [pose]).start()
+    assert pool.acquire(timeout=5) is pose
+
+
+def test_failed_build_gives_the_slot_back(monkeypatch):
+    pool = PosePool(size=1, timeout=0)
+    real_create = pose_pool._create_pose
+
+    def broken(options):
+        raise RuntimeError("graph setup failed")
+
+    monkeypatch.setattr(pose_pool, "_create_pose", broken)
+    for checkout in (pool.try_acquire, lambda: pool.warm(1)):
+        with pytest.raises(RuntimeError):
+            checkout()
+        assert pool.stats()["created"] == 0
+
+    monkeypatch.setattr(pose_pool, "_create_pose", real_create)
+    assert pool.try_acquire() is not None
+
+
+def test_warm_builds_idle_graphs_up_to_size():
+    pool = PosePool(size=2)
+    pool.warm(5)
+    assert pool.stats()["created"] == pool.stats()["idle"] == 2
+
+
+def test_trainer_reports_a_busy_pool_and_returns_its_graph(monkeypatch):
+    pool = PosePool(size=1, timeout=0)
+    monkeypatch.setattr(base_trainer, "pose_pool_for", lambda model_complexity=None: pool)
+    frame = cv2.imencode(".jpg", np.zeros((48, 64, 3), np.uint8))[1].tobytes()
+
+    holder = get_trainer_class("squats")()
+    assert "error" not in holder.process_frame(frame)
+    waiting = get_trainer_class("squats")()
+    result = waiting.process_frame(frame)
+    assert result["pose_busy"] is True
+    assert result["error"] == "No free pose graph (1 in use)"
+
+    holder.close()
+    assert pool.stats()["idle"] == 1
+    assert "error" not in waiting.process_frame(frame)
+    waiting.close()
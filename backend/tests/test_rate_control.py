@@ -0,0 +1,94 @@
+"""Adaptive frame rate / frame size hints sent to the client as control messages."""
+import pytest
+
+from app.ai_trainer.rate_control import RateController
+from app.config import settings
+
+
+@pytest.fixture
+def make_controller(monkeypatch):
+    def make(interval=0.0):
+        monkeypatch.setattr(settings, "TRAINER_TARGET_LATENCY_MS", 100.0)
+        monkeypatch.setattr(settings, "TRAINER_MIN_FPS", 2.0)
+        monkeypatch.setattr(settings, "TRAINER_MAX_FPS", 8.0)
+        monkeypatch.setattr(settings, "TRAINER_START_FPS", 5.0)
+        monkeypatch.setattr(settings, "TRAINER_FRAME_WIDTHS", [640, 320, 480])
+        monkeypatch.setattr(settings, "TRAINER_CONTROL_INTERVAL", interval)
+        return RateController()
+    return make
+
+
+def hints(controller, latency, processing, dropped=0, updates=1):
+    """(fps, max_width) after each update, None where nothing changed"""
+    sent = []
+    for _ in range(updates):
+        controller.record(latency, processing, dropped)
+        control = controller.update()
+        sent.append(control and (control["control"]["fps"], control["control"]["max_width"]))
+    return sent
+
+
+def test_first_update_sends_the_starting_hint(make_controller):
+    controller = make_controller()
+    assert controller.update() == {"control": {"fps": 5.0, "max_width": 640}}
+    # Unchanged targets aren't resent
+    assert controller.update() is None
+
+
+def test_overload_cuts_fps_then_frame_size(make_controller):
+    controller = make_controller()
+    controller.update()
+    assert hints(controller, 0.3, 0.02, updates=6) == [
+        (3.8, 640), (2.8, 640), (2.1, 640), (2.0, 640), (2.0, 480), (2.0, 320),
+    ]
+    # At the floor on both, nothing more to send
+    assert hints(controller, 0.3, 0.02) == [None]
+
+
+def test_dropped_frames_count_as_overload(make_controller):
+    controller = make_controller()
+    controller.update()
+    assert hints(controller, 0.01, 0.01, dropped=2) == [(3.8, 640)]
+
+
+def test_recovery_restores_size_before_fps(make_controller):
+    controller = make_controller()
+    controller.update()
+    hints(controller, 0.3, 0.02, updates=6)
+    # Moving averages need a few fast frames before latency is under half the target
+    assert [h for h in hints(controller, 0.001, 0.001, updates=20) if h] == [
+        (2.0, 480), (2.0, 640), (3.0, 640), (4.0, 640), (5.0, 640), (6.0, 640), (7.0, 640), (8.0, 640),
+    ]
+
+
+def test_fps_never_goes_above_processing_capacity(make_controller):
+    controller = make_controller()
+    controller.update()
+    # 250 ms per frame: one session can't do more than 4 fps however low the latency
+    for _ in range(20):
+        controller.record(0.01, 0.25)
+        controller.update()
+    assert controller.fps == 4.0
+
+
+def test_control_includes_the_measured_latency(make_controller):
+    controller = make_controller()
+    controller.update()
+    controller.record(0.3, 0.05)
+    assert controller.update() == {
+        "control": {"fps": 3.8, "max_width": 640, "latency_ms": 300.0, "processing_ms": 50.0}}
+
+
+def test_limit_caps_the_hint_right_away(make_controller):
+    controller = make_controller(interval=60.0)
+    controller.update()
+    controller.record(0.3, 0.05)
+    # Within the interval nothing is revised
+    assert controller.update() is None
+
+    # A new limit goes out on the next update, which also revises the (still overloaded) fps
+    controller.limit(1.0)
+    assert controller.update()["control"]["fps"] == 1.0
+    assert controller.fps == 3.75
+    controller.limit(None)
+    assert controller.update()["control"]["fps"] == 2.8
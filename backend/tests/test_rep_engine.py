@@ -0,0 +1,160 @@
+"""The spec table must count like the per-exercise trainers it replaced.
+
+Thresholds, feedback strings and set lengths below are the ones the old
+hand-written trainer modules used; each exercise is driven through its
+SpecTrainer with synthetic landmarks that put its metric at a chosen value.
+"""
+import math
+
+import pytest
+
+from app.ai_trainer.landmarks import LANDMARK_INDEX, NUM_LANDMARKS, Landmark
+from app.ai_trainer.registry import get_trainer_class
+
+IDLE = "Stay visible in frame"
+COMPLETE = "Set complete! Resetting..."
+
+
+def pose(points):
+    """33 landmarks at the frame centre, except the given {name: (x, y)}"""
+    landmarks = [Landmark(0.5, 0.5, 0.0, 1.0)] * NUM_LANDMARKS
+    for name, (x, y) in points.items():
+        landmarks[LANDMARK_INDEX[name]] = Landmark(x, y, 0.0, 1.0)
+    return landmarks
+
+
+def angle(a, b, c):
+    """Pose with the joint at b bent to the given degrees"""
+    def build(degrees):
+        radians = math.radians(degrees)
+        return pose({a: (0.5, 0.3), b: (0.5, 0.5), c: (0.5 + 0.2 * math.sin(radians), 0.5 - 0.2 * math.cos(radians))})
+    return build
+
+
+def gap(a, b):
+    """Pose with b the given distance below a"""
+    return lambda value: pose({a: (0.5, 0.4), b: (0.5, 0.4 + value)})
+
+
+def rise(base, *points):
+    """Pose with points the given distance above base (below when negative)"""
+    return lambda value: pose({base: (0.5, 0.6), **{point: (0.5, 0.6 - value) for point in points}})
+
+
+def jacks(values):
+    hands, feet = values
+    return pose({"leftWrist": (0.5 - hands / 2, 0.2), "rightWrist": (0.5 + hands / 2, 0.2),
+                 "leftAnkle": (0.5 - feet / 2, 0.9), "rightAnkle": (0.5 + feet / 2, 0.9)})
+
+
+KNEE = angle("leftHip", "leftKnee", "leftAnkle")
+ELBOW = angle("leftShoulder", "leftElbow", "leftWrist")
+PUSHUP = "Keep elbows at 45° and avoid flaring out."
+
+# exercise: (pose builder, metric key, rest, active, in between,
+#            rest feedback, active feedback, in-between feedback, set length, count on)
+BASELINE = {
+    "squats": (KNEE, "angle", 170, 80, 120, "Stand tall", "Go down!", IDLE, 30, "enter"),
+    "lunges": (KNEE, "angle", 170, 90, 130, "Push back up!", "Go down into lunge", IDLE, 30, "exit"),
+    "stepup": (KNEE, "angle", 170, 110, 140, "Lower back down", "Step up!", IDLE, 30, "enter"),
+    "calfraise": (gap("leftAnkle", "leftKnee"), "metric", 0.05, 0.2, 0.12,
+                  "Go up slowly", "Hold the top position!", IDLE, 30, "enter"),
+    "crunches": (angle("leftShoulder", "leftHip", "leftKnee"), "angle", 150, 90, 120,
+                 "Return slowly", "Crunch up! Engage core!", IDLE, 30, "enter"),
+    "bicepcurls": (ELBOW, "angle", 170, 30, 100, "Lower slowly", "Curl up!", IDLE, 30, "enter"),
+    "tricepdips": (ELBOW, "angle", 170, 80, 120, "Go down slowly", "Push up!", IDLE, 30, "enter"),
+    "pushups": (ELBOW, "angle", 170, 60, 100, PUSHUP, PUSHUP, PUSHUP, None, "exit"),
+    "jumpingjacks": (jacks, "metric", (0.1, 0.1), (0.6, 0.4), (0.35, 0.2),
+                     "Jump and raise arms!", "Great form!", IDLE, 30, "enter"),
+    "mountainclimbers": (gap("leftKnee", "leftWrist"), "metric", 0.4, 0.1, 0.25,
+                         "Extend leg back", "Drive knee forward!", IDLE, 40, "enter"),
+    "jumprope": (rise("leftHip", "leftAnkle", "rightAnkle"), "metric", 0.5, 0.3, 0.4,
+                 "Prepare to jump", "Nice jump!", IDLE, 100, "enter"),
+    "highknee": (rise("leftHip", "leftKnee"), "metric", 0.0, 0.25, 0.1,
+                 "Lift your knee higher!", "Good knee lift!", IDLE, 30, "enter"),
+    "buttkicks": (rise("leftHip", "leftHeel"), "metric", 0.0, 0.1, 0.03, "Lower slowly", "Kick up!", IDLE, 30, "enter"),
+}
+
+
+@pytest.fixture
+def trainer_for():
+    trainers = []
+
+    def make(name):
+        trainers.append(get_trainer_class(name)())
+        return trainers[-1]
+
+    yield make
+    for trainer in trainers:
+        trainer.close()
+
+
+@pytest.mark.parametrize("name", BASELINE)
+def test_reps_count_like_baseline(name, trainer_for):
+    build, key, rest, active, between, rest_text, active_text, between_text, _, count_on = BASELINE[name]
+    trainer = trainer_for(name)
+
+    frames = [rest, active, active, between, rest, active, None, rest]
+    results = [trainer.process_landmarks(build(value) if value is not None else None) for value in frames]
+
+    if count_on == "enter":
+        expected_counts = [0, 1, 1, 1, 1, 2, 2, 2]
+    else:
+        expected_counts = [0, 0, 0, 0, 1, 1, 1, 2]
+    assert [r["count"] for r in results] == expected_counts
+    assert [r["feedback"] for r in results] == [
+        rest_text, active_text, active_text, between_text, rest_text, active_text, IDLE, rest_text,
+    ]
+    assert results[6][key] is None
+    if key == "angle":
+        assert results[1][key] == pytest.approx(active)
+
+
+@pytest.mark.parametrize("name", [name for name, row in BASELINE.items() if row[8] is not None])
+def test_set_resets_after_set_length(name, trainer_for):
+    build, _, rest, active, _, _, _, _, set_length, _ = BASELINE[name]
+    trainer = trainer_for(name)
+    result = {"count": 0}
+    for value in [rest, active] * set_length + [rest]:
+        result = trainer.process_landmarks(build(value))
+        if result["count"] == set_length:
+            break
+    assert result["count"] == set_length
+
+    # The frame after the last rep starts the next set
+    assert trainer.process_landmarks(None) == dict(result, count=0, feedback=COMPLETE, **{BASELINE[name][1]: None})
+    # The rep after a reset counts as the first of the next set
+    trainer.process_landmarks(build(active))
+    assert trainer.process_landmarks(build(rest))["count"] == 1
+
+
+def test_pushups_extra_fields(trainer_for):
+    result = trainer_for("pushups").process_landmarks(ELBOW(170))
+    assert result["exercise"] == "push-ups"
+    assert result["form_score"] == 90
+
+
+def test_plank_hold_times_like_baseline(trainer_for):
+    trainer = trainer_for("plank")
+    body = angle("leftShoulder", "leftHip", "leftAnkle")
+    frames = [(0, 180), (5, 180), (6, 120), (7, 120), (20, 175), (21, 175), (30, None), (45, 180), (46, 180)]
+    results = [trainer.process_landmarks(body(value) if value is not None else None, now) for now, value in frames]
+
+    align, steady, lost = "Align body straight and stay visible", "Hold steady! Core tight.", "Posture lost! Timer paused."
+    # The old trainer kept the first start time through a break, and so does the spec
+    assert [(r["time"], r["feedback"]) for r in results] == [
+        (0, align), (5, steady), (5, lost), (5, align), (5, align), (21, steady), (21, align),
+        (45, "✅ 45s complete! Resetting..."), (0, align),
+    ]
+
+
+def test_wallsits_hold(trainer_for):
+    # A knee-angle hold since the hold monitor work; the old module was a copy of the elbow rep counter
+    trainer = trainer_for("wallsits")
+    frames = [(0, 90), (3, 95), (4, 150), (5, None)]
+    results = [trainer.process_landmarks(KNEE(value) if value is not None else None, now) for now, value in frames]
+
+    assert [(r["time"], r["feedback"]) for r in results] == [
+        (0, "Align properly within frame"), (3, "Hold it! Thighs parallel."),
+        (3, "Posture lost! Timer paused."), (3, "Align properly within frame"),
+    ]
@@ -0,0 +1,82 @@
+"""Rep counting regression tests: recorded sessions must replay to the counts they recorded.
+
+tests/recordings holds small recordings (app/ai_trainer/recording.py) made
+through the live trainer path. A change to a spec's thresholds or to the rep
+engine that alters counting shows up here as the first frame that differs.
+"""
+import math
+import os
+
+import numpy as np
+import pytest
+
+from app.ai_trainer.landmarks import LANDMARK_INDEX, Landmark
+from app.ai_trainer import recording
+from app.ai_trainer.recording import load_recording
+from app.ai_trainer.registry import EXERCISES, get_trainer_class
+from app.config import settings
+from benchmarks.replay_sessions import replay
+
+RECORDINGS = os.path.join(os.path.dirname(__file__), "recordings")
+
+
+def knee_pose(angle):
+    """Landmarks with the left knee bent to angle degrees"""
+    points = [[0.5, 0.5, 0.0, 0.9] for _ in range(33)]
+    radians = math.radians(angle)
+    points[LANDMARK_INDEX["leftKnee"]][:2] = [0.5, 0.6]
+    points[LANDMARK_INDEX["leftAnkle"]][:2] = [0.5, 0.8]
+    points[LANDMARK_INDEX["leftHip"]][:2] = [0.5 + 0.2 * math.sin(radians), 0.6 + 0.2 * math.cos(radians)]
+    return [Landmark(*p) for p in points]
+
+
+@pytest.mark.parametrize("name, final", [("squats", 5), ("wallsits", 19)])
+def test_recording_replays_to_recorded_counts(name, final):
+    records, info = load_recording(os.path.join(RECORDINGS, name))
+    assert info["exercise"] == name
+
+    counts = replay(records, EXERCISES[name])
+
+    assert counts == records["count"].tolist()
+    assert counts[-1] == final
+
+
+def test_replay_through_another_counter_differs():
+    records, _ = load_recording(os.path.join(RECORDINGS, "squats"))
+
+    # Lunges count on the way up and need a deeper bend than the recorded squats reach
+    assert replay(records, EXERCISES["lunges"]) != records["count"].tolist()
+
+
+def test_live_session_records_and_replays(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "TRAINER_RECORD_DIR", str(tmp_path))
+    trainer = get_trainer_class("squats")()
+    trainer.set_options({"record": "1"})
+    for angle in [170, 80] * 3 + [170]:
+        result = trainer.process_pose([[p.x, p.y, p.z, p.visibility] for p in knee_pose(angle)])
+    trainer.close()
+
+    [path] = tmp_path.glob("squats-*.npy")
+    records, info = load_recording(str(path))
+    assert info == {"exercise": "squats", "frames": 7, "format": "fitflow.recording.v1"}
+    assert result["count"] == 3
+    assert replay(records, EXERCISES["squats"]) == records["count"].tolist() == [0, 1, 1, 2, 2, 3, 3]
+    assert np.isfinite(records["metric"]).all()
+
+
+@pytest.mark.parametrize("frames", [0, 1, 250])
+def test_recorder_streams_rows_into_npy(tmp_path, monkeypatch, frames):
+    # Small chunks so the copy crosses chunk and row boundaries; never the whole file at once
+    monkeypatch.setattr(recording, "COPY_CHUNK_BYTES", 1000)
+    monkeypatch.setattr(np, "fromfile", None)
+    recorder = recording.SessionRecorder(str(tmp_path / "clip"), {"exercise": "squats"})
+    for i in range(frames):
+        recorder.add(knee_pose(80 + i % 90) if i % 7 else None, {"count": i // 10, "angle": 80 + i % 90}, now=i / 10)
+    recorder.close()
+
+    records, info = load_recording(str(tmp_path / "clip"))
+    assert info["frames"] == len(records) == frames
+    assert not (tmp_path / "clip.part").exists()
+    assert records["count"].tolist() == [i // 10 for i in range(frames)]
+    assert records["time"].tolist() == [i / 10 for i in range(frames)]
+    assert records["present"].tolist() == [bool(i % 7) for i in range(frames)]
@@ -0,0 +1,65 @@
+"""Trainer session stores, and the manager store's shared-secret requirement."""
+import os
+import subprocess
+import sys
+from multiprocessing import AuthenticationError
+
+import pytest
+
+from app.ai_trainer import session_store
+from app.ai_trainer.session_store import ManagerSessionStore, MemorySessionStore
+from app.config import settings
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def store_server():
+    """Manager store on a free loopback port, as (host:port, authkey)"""
+    manager = session_store._StoreManager(address=("127.0.0.1", 0), authkey=b"test-secret")
+    manager.start()
+    host, port = manager.address
+    yield f"{host}:{port}", "test-secret"
+    manager.shutdown()
+
+
+def test_memory_store_expires_states():
+    store = MemorySessionStore(ttl=60)
+    store.put("squats:a", {"count": 3})
+    assert store.get("squats:a") == {"count": 3}
+    assert store.get("squats:b") is None
+
+    store = MemorySessionStore(ttl=-1)
+    store.put("squats:a", {"count": 3})
+    assert store.get("squats:a") is None
+
+
+def test_manager_store_needs_an_authkey(monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_STORE_AUTHKEY", "")
+    with pytest.raises(ValueError, match="SESSION_STORE_AUTHKEY"):
+        ManagerSessionStore(address="127.0.0.1:1")
+    with pytest.raises(ValueError, match="SESSION_STORE_AUTHKEY"):
+        session_store.serve("127.0.0.1:0")
+
+
+def test_store_server_refuses_to_start_without_an_authkey():
+    env = dict(os.environ, SESSION_STORE_AUTHKEY="")
+    run = subprocess.run([sys.executable, "-m", "app.ai_trainer.session_store", "--address", "127.0.0.1:0"],
+                         cwd=BACKEND, env=env, capture_output=True, text=True, timeout=60)
+    assert run.returncode != 0
+    assert "Set SESSION_STORE_AUTHKEY" in run.stderr
+
+
+def test_manager_store_shares_state_with_the_right_key(store_server):
+    address, authkey = store_server
+    writer = ManagerSessionStore(address, authkey)
+    reader = ManagerSessionStore(address, authkey)
+    writer.put("plank:a", {"duration": 12, "start_wall": None})
+    assert reader.get("plank:a") == {"duration": 12, "start_wall": None}
+    assert reader.size() == 1
+
+
+def test_manager_store_rejects_a_wrong_key(store_server):
+    address, _ = store_server
+    with pytest.raises(AuthenticationError):
+        ManagerSessionStore(address, "guessed")
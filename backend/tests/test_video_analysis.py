@@ -0,0 +1,108 @@
+"""Offline video analysis: chunked work units must see the frames a sequential read sees."""
+import math
+
+import cv2
+import numpy as np
+import pytest
+from mediapipe.framework.formats import landmark_pb2
+
+from app.ai_trainer import video_analysis
+from app.ai_trainer.landmarks import LANDMARK_INDEX, NUM_LANDMARKS
+from app.ai_trainer.registry import EXERCISES
+from app.ai_trainer.stub_pose import StubResults
+from app.config import settings
+
+FRAMES = 150
+FPS = 30
+# Frames per squat in the generated clip
+PERIOD = 25
+
+_RealCapture = cv2.VideoCapture
+
+
+def gray_level(index):
+    """Brightness of frame index: dark at the bottom of each squat, bright standing"""
+    phase = (1 - math.cos(2 * math.pi * index / PERIOD)) / 2
+    return round(200 - 150 * phase)
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("video") / "squats.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (64, 64))
+    for index in range(FRAMES):
+        writer.write(np.full((64, 64, 3), gray_level(index), np.uint8))
+    writer.release()
+    return path
+
+
+class KeyframeSeekCapture:
+    """VideoCapture whose frame seeks land on the keyframe before the target, like many codecs do"""
+
+    def __init__(self, path):
+        self._capture = _RealCapture(path)
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            value -= value % 12
+        return self._capture.set(prop, value)
+
+    def __getattr__(self, name):
+        return getattr(self._capture, name)
+
+
+class BrightnessPose:
+    """Pose stand-in reading the knee angle off the frame's brightness"""
+
+    def process(self, image):
+        angle = math.radians(50 + (float(image.mean()) - 50) / 150 * 130)
+        landmarks = landmark_pb2.NormalizedLandmarkList()
+        points = [(0.5, 0.5)] * NUM_LANDMARKS
+        for side in ("left", "right"):
+            points[LANDMARK_INDEX[side + "Knee"]] = (0.5, 0.6)
+            points[LANDMARK_INDEX[side + "Ankle"]] = (0.5, 0.8)
+            points[LANDMARK_INDEX[side + "Hip"]] = (0.5 + 0.2 * math.sin(angle), 0.6 + 0.2 * math.cos(angle))
+        for x, y in points:
+            landmarks.landmark.add(x=x, y=y, z=0.0, visibility=0.99)
+        return StubResults(landmarks)
+
+    def reset(self):
+        pass
+
+
+class BrightnessPool:
+    def acquire(self):
+        return BrightnessPose()
+
+    def release(self, pose):
+        pass
+
+
+def read_means(capture, start, stop, step):
+    return [(index, seconds, frame.mean()) for index, seconds, frame in
+            video_analysis.iter_frames(capture, start, stop, step)]
+
+
+@pytest.mark.parametrize("capture_class", [_RealCapture, KeyframeSeekCapture])
+def test_chunk_reads_the_frames_of_a_sequential_pass(clip, monkeypatch, capture_class):
+    monkeypatch.setattr(cv2, "VideoCapture", capture_class)
+    sequential = read_means(_RealCapture(clip), 0, None, 1)
+    assert len(sequential) == FRAMES
+
+    for start, stop in [(0, 40), (40, 80), (61, 150), (137, 150)]:
+        assert read_means(video_analysis.open_video(clip, start), start, stop, 1) == sequential[start:stop]
+
+
+def test_chunked_counts_match_sequential(clip, monkeypatch):
+    monkeypatch.setattr(cv2, "VideoCapture", KeyframeSeekCapture)
+    monkeypatch.setattr(video_analysis, "pose_pool_for", lambda model_complexity=None: BrightnessPool())
+    monkeypatch.setattr(settings, "POSE_ROI", False)
+    monkeypatch.setattr(settings, "VIDEO_CHUNK_FRAMES", 7)
+    spec = EXERCISES["squats"]
+
+    sequential = video_analysis.analyze_video(clip, spec, sample_fps=15, workers=1)
+    chunked = video_analysis.analyze_video(clip, spec, sample_fps=15, workers=3)
+
+    assert sequential["reps"] == FRAMES // PERIOD
+    for key in ("reps", "sets", "frames_analysed", "duration", "timeline"):
+        assert chunked[key] == sequential[key]
@@ -12,7 +12,7 @@
   const REST_PERIOD_SECONDS = 30;
   const REST_BETWEEN_EXERCISES_SECONDS = 60;
   const INITIAL_COUNTDOWN_SECONDS = 3;
-  const FRAME_SEND_INTERVAL_MS = 200; // Send frames every 200ms (5 FPS)
+  const FRAME_SEND_INTERVAL_MS = 200; // Send frames every 200ms (5 FPS) until the server says otherwise
   // NOTE: if your TS complains about import.meta, cast to any (Vite env)
   const WEBSOCKET_URL = (import.meta as any).env?.VITE_WS_URL || 'ws://127.0.0.1:8000/ws/ai_trainer/';
   
@@ -170,6 +170,9 @@
     const captureCanvasRef = useRef<HTMLCanvasElement>(null);
     const socketRef = useRef<WebSocket | null>(null);
     const frameIntervalRef = useRef<number | null>(null);
+    // Send rate and frame width, adjusted by the server's {"control": {...}} messages
+    const sendIntervalMsRef = useRef(FRAME_SEND_INTERVAL_MS);
+    const maxFrameWidthRef = useRef<number | null>(null);
     const reconnectTimeoutRef = useRef<number | null>(null);
     const reconnectAttemptsRef = useRef(0);
     const hasFinishedRef = useRef(false);
@@ -278,7 +281,9 @@
 
       let closedByUs = false;
       const exerciseId = mapExerciseIdToBackend(currentExercise.id);
-      const wsUrl = `${WEBSOCKET_URL}${exerciseId}`;
+      // Reconnects reuse the id, so the server resumes this set's count instead of starting at 0
+      const sessionId = `${exerciseId}-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+      const wsUrl = `${WEBSOCKET_URL}${exerciseId}?session=${sessionId}`;
 
       // Connector that can attempt reconnect with exponential backoff
       const connect = () => {
@@ -301,14 +306,30 @@
           try {
             const raw = event.data;
             const parsed = typeof raw === 'string' ? JSON.parse(raw) : raw;
+
+            // Server-side rate control: throttle to the fps / frame width it can keep up with
+            if (parsed.control) {
+              const { fps, max_width: maxWidth } = parsed.control;
+              if (typeof maxWidth === 'number') maxFrameWidthRef.current = maxWidth;
+              if (typeof fps === 'number' && fps > 0) {
+                const interval = Math.round(1000 / fps);
+                if (interval !== sendIntervalMsRef.current) {
+                  sendIntervalMsRef.current = interval;
+                  if (frameIntervalRef.current !== null) startSending();
+                }
+              }
+              return;
+            }
             const frameSrc = parsed.frame
               ? (typeof parsed.frame === 'string' && parsed.frame.startsWith('data:') ? parsed.frame : `data:image/jpeg;base64,${parsed.frame}`)
               : undefined;
 
             setBackendData((prev) => ({
-              count: typeof parsed.count === 'number' ? parsed.count : prev.count || 0,
+              // Holds (plank, wall sits) report seconds held by the server's clock as `time`
+              count: typeof parsed.time === 'number' ? parsed.time : typeof parsed.count === 'number' ? parsed.count : prev.count || 0,
               status: parsed.feedback || parsed.status || (typeof parsed.count === 'number' ? `Reps: ${parsed.count}` : prev.status),
-              frame: frameSrc,
+              // Results sent without a picture (frame_every) keep showing the last one
+              frame: frameSrc ?? prev.frame,
             }));
           } catch (err) {
             console.error('Failed to parse WS message:', err, event.data);
@@ -374,8 +395,11 @@
                 return;
               }
 
-              canvas.width = vw;
-              canvas.height = vh;
+              // Downscale to the width the server asked for (keeps aspect ratio)
+              const maxWidth = maxFrameWidthRef.current;
+              const scale = maxWidth && vw > maxWidth ? maxWidth / vw : 1;
+              canvas.width = Math.round(vw * scale);
+              canvas.height = Math.round(vh * scale);
               const ctx = canvas.getContext('2d');
               if (!ctx) return;
 
@@ -398,7 +422,7 @@
             } catch (err) {
               console.error('Error sending frame:', err);
             }
-          }, FRAME_SEND_INTERVAL_MS);
+          }, sendIntervalMsRef.current);
         };
 
         // Trigger startSending either immediately if open or once open
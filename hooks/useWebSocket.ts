@@ -3,6 +3,8 @@ import { useEffect, useRef, useState } from "react";
 export function useWebSocket(exercise: string) {
   const [isConnected, setIsConnected] = useState(false);
   const [messages, setMessages] = useState<string[]>([]);
+  // Latest {"control": {...}} from the trainer: the fps and frame width it can keep up with
+  const [control, setControl] = useState<{ fps: number; max_width: number } | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
 
   useEffect(() => {
@@ -18,6 +20,10 @@ export function useWebSocket(exercise: string) {
     };
 
     socket.onmessage = (event) => {
+      if (typeof event.data === "string" && event.data.startsWith('{"control"')) {
+        setControl(JSON.parse(event.data).control);
+        return;
+      }
       console.log(`📨 Message from ${exercise}:`, event.data);
       setMessages((prev) => [...prev, event.data]);
     };
@@ -44,5 +50,5 @@ export function useWebSocket(exercise: string) {
     }
   };
 
-  return { isConnected, messages, sendMessage };
+  return { isConnected, messages, sendMessage, control };
 }